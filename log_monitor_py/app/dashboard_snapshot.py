@@ -0,0 +1,127 @@
+"""
+Foto única de los paneles del dashboard (CPU, RAM y procesos).
+
+En vez de un pedido por panel, el dashboard pide /api/dashboard/snapshot.
+La respuesta se serializa una sola vez por versión (muestra del sampler +
+foto de procesos) y se comparte entre todos los clientes. El ETag no es esa
+versión sino un hash de lo que muestran los paneles a la resolución del
+dashboard (porcentajes de a ETAG_PERCENT_STEP puntos, memoria en MB /
+décimas de GB, procesos por PID y nombre): el sampler corre cada segundo y
+el dashboard pide cada dos, así que una muestra nueva que se ve igual sigue
+contestando 304 y el cuerpo guardado (con los números de la primera muestra
+de esa versión) se reutiliza. El ETag no incluye la hora a propósito: ante
+un 304 el dashboard repite el último valor en los gráficos, que así siguen
+avanzando aunque CPU y RAM no se muevan.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+from .keyword_matcher import suspicious_keywords
+from .metrics_sampler import metrics_sampler
+from .proc_snapshot import process_snapshot
+
+_MB = 1024 * 1024
+# Puntos de % de CPU/RAM que tienen que moverse para cambiar el ETag
+ETAG_PERCENT_STEP = 1.0
+
+
+def display_bytes(value: int) -> int:
+    """Bytes redondeados como los muestra el dashboard: MB hasta 1 GB, después décimas de GB."""
+    if value < 1024 * _MB:
+        return round(value / _MB) * _MB
+    return int(round(value / (1024 * _MB), 1) * 1024 * _MB)
+
+
+def _step(percent: float) -> int:
+    return round(percent / ETAG_PERCENT_STEP)
+
+
+def panels_etag(panels: Dict[str, Any], limit: int) -> str:
+    """ETag de los paneles a la resolución del dashboard (ver docstring del módulo)."""
+    view = (
+        _step(panels["cpu"]["percent"]),
+        panels["cpu"]["cores"],
+        _step(panels["memory"]["percent"]),
+        [display_bytes(panels["memory"][k]) for k in ("total", "used", "available")],
+        [
+            (p["pid"], p["name"], _step(p["cpu_percent"]), _step(p["memory_percent"]), p["keyword"])
+            for p in panels["processes"]
+        ],
+    )
+    digest = hashlib.blake2b(json.dumps(view).encode("utf-8"), digest_size=8).hexdigest()
+    return f'"{limit}-{digest}"'
+
+
+def process_rows(processes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Filas de la tabla de procesos, con 'suspicious' si consumen mucho o si
+    el nombre del proceso contiene una keyword. Se mira el nombre y no el
+    comando completo: keywords cortas como "crypt" matchearían argumentos
+    inofensivos (el CLI, que lista sólo los hallazgos, sí usa el comando).
+    """
+    rows = []
+    # Un solo stat del archivo de reglas por tabla, no uno por proceso
+    matcher = suspicious_keywords.matcher()
+    for p in processes:
+        cpu = p["cpu_percent"]
+        mem = p["memory_percent"]
+        keyword = matcher.first(p["name"].lower())
+        rows.append(
+            {
+                "pid": p["pid"],
+                "name": p["name"],
+                "cpu_percent": cpu,
+                "memory_percent": mem,
+                "suspicious": cpu >= 50 or mem >= 10 or keyword is not None,
+                "keyword": keyword,
+            }
+        )
+    return rows
+
+
+class DashboardSnapshot:
+    """Cuerpo JSON + ETag de la última versión armada, por cantidad de procesos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # limit -> (versión, ETag, cuerpo)
+        self._cache: Dict[int, Tuple[Tuple[float, float], str, bytes]] = {}
+
+    def get(self, limit: int) -> Tuple[str, bytes]:
+        sample = metrics_sampler.latest()
+        # Renueva la foto de procesos si está vieja (si no, no hace nada)
+        process_snapshot.snapshot()
+        version = (sample["ts"], process_snapshot.taken_at)
+
+        with self._lock:
+            cached = self._cache.get(limit)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        panels = {
+            "cpu": {"percent": sample["cpu_percent"], "cores": sample["cores"]},
+            "memory": {
+                "percent": sample["mem_percent"],
+                "total": sample["mem_total"],
+                "used": sample["mem_used"],
+                "available": sample["mem_available"],
+            },
+            "processes": process_rows(process_snapshot.top(limit)),
+        }
+        etag = panels_etag(panels, limit)
+
+        if cached is not None and cached[1] == etag:
+            # Muestra nueva pero los paneles se ven igual: mismo cuerpo y ETag
+            body = cached[2]
+        else:
+            # "ts" es la muestra de la que salieron los números
+            body = json.dumps({"ts": sample["ts"], **panels}).encode("utf-8")
+        with self._lock:
+            self._cache[limit] = (version, etag, body)
+        return etag, body
+
+
+dashboard_snapshot = DashboardSnapshot()
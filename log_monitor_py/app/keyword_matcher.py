@@ -0,0 +1,127 @@
+"""
+Detección de keywords sospechosas en comandos de procesos.
+
+Todas las keywords se compilan en un único autómata Aho-Corasick: cada
+comando se recorre una sola vez, así que el costo depende del largo del
+comando y no de cuántas keywords haya cargadas. La lista sale de
+rules/suspicious_keywords.txt (o de LOG_MONITOR_KEYWORDS) y se recarga sola
+cuando el archivo cambia.
+"""
+
+from collections import deque
+import os
+from pathlib import Path
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+RULES_FILE = Path(
+    os.environ.get(
+        "LOG_MONITOR_KEYWORDS",
+        Path(__file__).resolve().parent / "rules" / "suspicious_keywords.txt",
+    )
+)
+
+
+class AhoCorasick:
+    """Autómata para buscar muchas keywords a la vez en un texto."""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self.keywords: List[str] = []
+
+        for keyword in dict.fromkeys(keywords):
+            if keyword:
+                self._add(keyword)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (keyword,)
+        self.keywords.append(keyword)
+
+    def _build(self) -> None:
+        # Links de falla por BFS: el sufijo más largo que también es prefijo
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(posición donde termina, keyword) por cada aparición en 'text'."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword in out[state]:
+                yield i + 1, keyword
+
+    def first(self, text: str) -> Optional[str]:
+        """La primera keyword que aparece en 'text', o None."""
+        for _, keyword in self.iter_matches(text):
+            return keyword
+        return None
+
+
+def load_keywords(path: Path) -> List[str]:
+    """
+    Lee el archivo de reglas: una keyword por línea, '#' para comentarios.
+    Entre comillas se respetan los espacios ("nc "); si no, se recortan.
+    """
+    keywords: List[str] = []
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if len(line) >= 2 and line[0] == line[-1] == '"':
+            line = line[1:-1]
+        keywords.append(line.lower())
+    return keywords
+
+
+class KeywordRules:
+    """Matcher compilado desde un archivo de reglas, recargado si cambia."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._matcher = AhoCorasick([])
+
+    def matcher(self) -> AhoCorasick:
+        try:
+            st = self.path.stat()
+            stamp: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._matcher = AhoCorasick(load_keywords(self.path) if stamp else [])
+                    self._stamp = stamp
+        return self._matcher
+
+
+suspicious_keywords = KeywordRules(RULES_FILE)
@@ -0,0 +1,111 @@
+"""
+Agregación de varios logs en una sola respuesta.
+
+Parsea los archivos en paralelo y devuelve conteos combinados, el detalle
+por archivo y una ventana "recent" única ordenada por timestamp. Los campos
+de formatos estructurados (percentiles, top de endpoints, clientes) salen de
+combinar los sketches de cada archivo, sin volver a leer nada.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import heapq
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .log_family import segment_cache
+from .log_parser import RECENT_LIMIT, LogStats, parse_log_stats, stats_cache
+from .log_reader import is_compressed
+
+# Tope de archivos por consulta
+MAX_AGGREGATE_FILES = 200
+
+
+def resolve_log_files(
+    logs_dir: Path, pattern: Optional[str] = None, files: Optional[Iterable[str]] = None
+) -> List[Path]:
+    """
+    Archivos dentro de logs_dir que matchean 'pattern' (glob, ej. "*.log")
+    más los nombrados en 'files'. No se permite salir de logs_dir.
+    """
+    base = logs_dir.resolve()
+    found: Dict[Path, None] = {}
+
+    if pattern:
+        if pattern.startswith("/") or ".." in Path(pattern).parts:
+            raise ValueError("El patrón tiene que ser relativo a la carpeta logs/")
+        for path in sorted(base.glob(pattern)):
+            # Se saltean índices y otros archivos ocultos
+            if path.is_file() and not path.name.startswith("."):
+                found[path] = None
+
+    for name in files or []:
+        path = (base / name).resolve()
+        if base not in path.parents:
+            raise ValueError(f"'{name}' está fuera de la carpeta logs/")
+        if not path.is_file():
+            raise FileNotFoundError(f"El archivo '{name}' no existe en logs/.")
+        found[path] = None
+
+    if len(found) > MAX_AGGREGATE_FILES:
+        raise ValueError(f"Demasiados archivos (máximo {MAX_AGGREGATE_FILES})")
+    return list(found)
+
+
+def _cached_stats(path: Path) -> LogStats:
+    # Los comprimidos son rotados (no cambian): van al cache de segmentos
+    if is_compressed(path):
+        return segment_cache.get(path)[0].copy()
+    return stats_cache.stats(path)
+
+
+def _make_pool(mode: str, workers: Optional[int], jobs: int) -> Executor:
+    workers = max(1, min(workers or os.cpu_count() or 1, jobs))
+    if mode == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def aggregate_logs(
+    paths: List[Path],
+    mode: str = "thread",
+    workers: Optional[int] = None,
+    logs_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    mode="thread" usa el cache incremental (las consultas repetidas sólo
+    leen lo nuevo); mode="process" reparte parseos completos entre
+    procesos, útil la primera vez con muchos archivos grandes.
+
+    Los archivos se identifican por su ruta relativa a 'logs_dir' (con un
+    glob "**" puede haber varios app.log). Las líneas sin timestamp no
+    entran en "recent": no hay forma de ubicarlas entre las de otros archivos.
+    """
+    base = logs_dir.resolve() if logs_dir is not None else None
+    per_file: Dict[str, Dict[str, Any]] = {}
+    combined = LogStats()
+    recents: List[List[Dict[str, Any]]] = []
+
+    if paths:
+        parse = parse_log_stats if mode == "process" else _cached_stats
+        with _make_pool(mode, workers, len(paths)) as pool:
+            results = list(zip(paths, pool.map(parse, paths)))
+
+        for path, stats in results:
+            name = path.relative_to(base).as_posix() if base is not None else path.name
+            result = stats.as_dict()
+            per_file[name] = {
+                "total_lines": result["total_lines"],
+                "level_counts": result["level_counts"],
+            }
+            if "fields" in result:
+                per_file[name]["fields"] = result["fields"]
+            combined.merge(stats)
+            recents.append(
+                [dict(line, file=name) for line in result["recent"] if line["ts"]]
+            )
+
+    result = combined.as_dict()
+    merged = list(heapq.merge(*recents, key=lambda line: line["ts"]))
+    result["recent"] = merged[-RECENT_LIMIT:]
+    return {"files": per_file, **result}
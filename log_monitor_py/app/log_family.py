@@ -0,0 +1,193 @@
+"""
+Familias de logs rotados (logrotate).
+
+"app.log" + "app.log.1" + "app.log.2.gz" (o "app.log-20251127.gz" con
+dateext) se tratan como un único stream lógico, del segmento más viejo al
+archivo vivo. Los segmentos rotados no cambian, así que su resultado se
+cachea por inodo + mtime y, después de la primera vez, un resumen de la
+familia sólo lee lo nuevo del archivo vivo (cache incremental).
+"""
+
+from collections import OrderedDict, deque
+import mmap
+from pathlib import Path
+import re
+import threading
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .log_formats import DEFAULT_FORMAT, LogFormat, detect_format
+from .log_parser import LogStats, scan_range, scan_records, stats_cache
+from .log_reader import COMPRESSED_SUFFIXES, is_compressed, open_log, tail_lines
+from .log_rollup import LevelRollup
+
+# Segmentos rotados cuyo resultado se mantiene en memoria
+SEGMENT_CACHE_SIZE = 128
+
+
+def log_family(log_path: Path) -> List[Path]:
+    """
+    Segmentos de la familia ordenados del más viejo al más nuevo; el último
+    es el archivo vivo (si existe).
+    """
+    name = re.escape(log_path.name)
+    compressed = "|".join(re.escape(s) for s in COMPRESSED_SUFFIXES)
+    numbered = re.compile(rf"^{name}\.(\d+)(?:{compressed})?$")
+    dated = re.compile(rf"^{name}-(\d{{8,10}})(?:{compressed})?$")
+
+    rotated: List[Tuple[Tuple[int, int], Path]] = []
+    if log_path.parent.is_dir():
+        for candidate in log_path.parent.iterdir():
+            m = numbered.match(candidate.name)
+            if m:
+                # app.log.1 es más nuevo que app.log.2
+                rotated.append(((1, -int(m.group(1))), candidate))
+                continue
+            m = dated.match(candidate.name)
+            if m:
+                rotated.append(((0, int(m.group(1))), candidate))
+
+    segments = [path for _, path in sorted(rotated)]
+    if log_path.exists():
+        segments.append(log_path)
+    return segments
+
+
+class _SegmentCache:
+    """Resultados de segmentos rotados, por (ruta, inodo, mtime, tamaño)."""
+
+    def __init__(self, max_segments: int = SEGMENT_CACHE_SIZE) -> None:
+        self.max_segments = max_segments
+        self._entries: "OrderedDict[tuple, Tuple[LogStats, LevelRollup]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, segment: Path, fmt: Optional[LogFormat] = None) -> Tuple[LogStats, LevelRollup]:
+        st = segment.stat()
+        key = (
+            str(segment.resolve()), st.st_ino, st.st_mtime_ns, st.st_size,
+            fmt.name if fmt is not None else None,
+        )
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        cached = _parse_segment(segment, fmt)
+        with self._lock:
+            self._entries[key] = cached
+            while len(self._entries) > self.max_segments:
+                self._entries.popitem(last=False)
+        return cached
+
+
+def _parse_segment(segment: Path, fmt: Optional[LogFormat] = None) -> Tuple[LogStats, LevelRollup]:
+    rollup = LevelRollup()
+    fmt = fmt or detect_format(segment)
+    if not is_compressed(segment):
+        with segment.open("rb") as f:
+            size = segment.stat().st_size
+            if not size:
+                return LogStats(), rollup
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if fmt is not DEFAULT_FORMAT:
+                    return scan_records(mm, 0, size, fmt, rollup=rollup), rollup
+                rollup.add_range(mm, 0, size)
+                return scan_range(mm, 0, size), rollup
+
+    # Comprimido: una pasada en streaming, de a bloques de líneas
+    stats = LogStats()
+    with open_log(segment) as f:
+        while True:
+            block = f.readlines(4 * 1024 * 1024)
+            if not block:
+                break
+            data = b"".join(block)
+            if fmt is not DEFAULT_FORMAT:
+                scan_records(data, 0, len(data), fmt, rollup=rollup, stats=stats)
+                continue
+            for raw in block:
+                stats.add_line(raw.rstrip(b"\n").decode("utf-8", errors="ignore"))
+            rollup.add_range(data, 0, len(data))
+    return stats, rollup
+
+
+segment_cache = _SegmentCache()
+
+
+def parse_log_family(log_path: Path, fmt: Optional[LogFormat] = None) -> Dict[str, Any]:
+    """
+    Métricas de toda la familia (mismo formato que parse_log_file, más la
+    lista de segmentos). Los rotados salen del cache; el vivo, del cache
+    incremental. Sin 'fmt', el formato se detecta por segmento.
+    """
+    segments = log_family(log_path)
+    if not segments:
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    stats = LogStats()
+    for segment in segments:
+        if segment == log_path:
+            stats.merge(stats_cache.stats(segment, fmt))
+        else:
+            stats.merge(segment_cache.get(segment, fmt)[0])
+
+    result = stats.as_dict()
+    result["segments"] = [segment.name for segment in segments]
+    return result
+
+
+def _resolution_for(since: Optional[str], until: Optional[str]) -> str:
+    width = max(len(since or ""), len(until or ""))
+    if width and width <= 10:
+        return "day"
+    if width and width <= 13:
+        return "hour"
+    return "minute"
+
+
+def summarize_family_range(
+    log_path: Path,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fmt: Optional[LogFormat] = None,
+) -> Dict[str, Any]:
+    """
+    Conteo por nivel de la familia entre 'since' y 'until', a partir de los
+    histogramas (rollups). Con fechas ("2025-11-27") se usan buckets
+    diarios; con hora o minuto, los más finos.
+    """
+    segments = log_family(log_path)
+    if not segments:
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    resolution = _resolution_for(since, until)
+    level_counts: Dict[str, int] = {}
+    for segment in segments:
+        if segment == log_path:
+            hist = stats_cache.histogram(segment, resolution, since, until, fmt)
+        else:
+            hist = segment_cache.get(segment, fmt)[1].histogram(resolution, since, until)
+        for bucket in hist["buckets"]:
+            for level, count in zip(hist["levels"], bucket["counts"]):
+                if count:
+                    level_counts[level] = level_counts.get(level, 0) + count
+
+    return {
+        "since": since,
+        "until": until,
+        "resolution": resolution,
+        "level_counts": level_counts,
+        "segments": [segment.name for segment in segments],
+    }
+
+
+def tail_family(log_path: Path, lines: int) -> List[str]:
+    """Últimas 'lines' líneas; si el vivo no alcanza, sigue con los rotados."""
+    out: Deque[str] = deque()
+    for segment in reversed(log_family(log_path)):
+        missing = lines - len(out)
+        if missing <= 0:
+            break
+        out.extendleft(reversed(tail_lines(segment, missing)))
+    return list(out)
+
@@ -0,0 +1,275 @@
+"""
+Seguimiento de logs en tiempo real (tail -f) para varios archivos a la vez.
+
+En Linux usa inotify sobre el directorio de cada log: el proceso duerme hasta
+que el kernel avisa un cambio, sin polling. En otras plataformas (o si
+inotify no está disponible) cae a un polling por intervalo con os.stat.
+Detecta rotación por rename/create y truncado, y sigue leyendo el archivo
+nuevo sin reiniciar.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Intervalo del modo polling (sin inotify)
+POLL_INTERVAL = 0.5
+
+
+class LogLine(NamedTuple):
+    path: Path
+    # Offset en bytes al final de la línea (sirve para reanudar)
+    offset: int
+    text: str
+
+
+class _Inotify:
+    """Wrapper mínimo de inotify vía ctypes (sólo stdlib)."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    def add_watch(self, directory: Path) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(directory))
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: Optional[float]) -> List[Tuple[int, int, str]]:
+        """Espera eventos hasta 'timeout' segundos (None = sin límite)."""
+        ms = None if timeout is None else int(timeout * 1000)
+        if not self._poller.poll(ms):
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        pos = 0
+        while pos < len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, pos)
+            pos += _EVENT_HEADER.size
+            name = buf[pos:pos + length].rstrip(b"\0").decode("utf-8", errors="ignore")
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Tracked:
+    """Estado de un archivo seguido."""
+
+    def __init__(self, path: Path, offset: Optional[int]) -> None:
+        self.path = path
+        self.fh = None
+        self.inode: Optional[int] = None
+        self.offset = 0
+        self.pending = b""
+        self._open(offset)
+
+    def _open(self, offset: Optional[int]) -> None:
+        try:
+            fh = self.path.open("rb")
+        except FileNotFoundError:
+            self.fh = None
+            self.inode = None
+            return
+        st = os.fstat(fh.fileno())
+        self.fh = fh
+        self.inode = st.st_ino
+        # offset None = arrancar desde el final (como tail -f)
+        self.offset = st.st_size if offset is None else min(offset, st.st_size)
+        self.pending = b""
+        fh.seek(self.offset)
+
+    def _read_available(self) -> List[LogLine]:
+        out: List[LogLine] = []
+        if self.fh is None:
+            return out
+        data = self.fh.read()
+        if not data:
+            return out
+        start = self.offset - len(self.pending)
+        data = self.pending + data
+        self.offset = start + len(data)
+        *complete, self.pending = data.split(b"\n")
+        for raw in complete:
+            start += len(raw) + 1
+            out.append(LogLine(self.path, start, raw.decode("utf-8", errors="ignore").rstrip("\r")))
+        return out
+
+    def drain(self) -> List[LogLine]:
+        """Lee lo nuevo y maneja rotación/truncado."""
+        out = self._read_available()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # Rotado y todavía no se creó el nuevo: seguimos con el fd viejo
+            return out
+
+        if self.fh is None or st.st_ino != self.inode:
+            # Rotación: el archivo nuevo se lee desde el principio
+            if self.fh is not None:
+                self.fh.close()
+            self._open(0)
+            out.extend(self._read_available())
+        elif st.st_size < self.offset:
+            # Truncado (copytruncate)
+            self.fh.seek(0)
+            self.offset = 0
+            self.pending = b""
+            out.extend(self._read_available())
+        return out
+
+    def close(self) -> None:
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+
+class LogFollower:
+    """
+    Sigue uno o más logs y devuelve las líneas nuevas apenas se escriben.
+
+        follower = LogFollower()
+        follower.add(Path("app/logs/example.log"))
+        for line in follower.follow():
+            print(line.text)
+    """
+
+    def __init__(self, use_inotify: Optional[bool] = None, poll_interval: float = POLL_INTERVAL) -> None:
+        self.poll_interval = poll_interval
+        self._files: Dict[Path, _Tracked] = {}
+        self._inotify: Optional[_Inotify] = None
+        # wd -> directorio, y directorio -> wd
+        self._dirs: Dict[Path, int] = {}
+        self._wd_dirs: Dict[int, Path] = {}
+
+        if use_inotify is None:
+            use_inotify = sys.platform.startswith("linux")
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    @property
+    def paths(self) -> List[Path]:
+        return list(self._files)
+
+    def add(self, path: Path, offset: Optional[int] = None) -> None:
+        """Empieza a seguir 'path' desde 'offset' (None = desde el final)."""
+        path = Path(os.path.abspath(path))
+        if path in self._files:
+            return
+        directory = path.parent
+        if self._inotify is not None and directory not in self._dirs:
+            wd = self._inotify.add_watch(directory)
+            self._dirs[directory] = wd
+            self._wd_dirs[wd] = directory
+        self._files[path] = _Tracked(path, offset)
+
+    def remove(self, path: Path) -> None:
+        path = Path(os.path.abspath(path))
+        tracked = self._files.pop(path, None)
+        if tracked is None:
+            return
+        tracked.close()
+        directory = path.parent
+        if self._inotify is not None and not any(p.parent == directory for p in self._files):
+            wd = self._dirs.pop(directory)
+            self._wd_dirs.pop(wd, None)
+            self._inotify.rm_watch(wd)
+
+    def offset(self, path: Path) -> int:
+        """Offset hasta donde se leyó 'path' (última línea completa)."""
+        tracked = self._files[Path(os.path.abspath(path))]
+        return tracked.offset - len(tracked.pending)
+
+    def poll(self, timeout: Optional[float] = None) -> List[LogLine]:
+        """
+        Espera cambios hasta 'timeout' segundos y devuelve las líneas nuevas.
+        Con inotify el proceso queda dormido hasta que algún log cambie.
+        """
+        if self._inotify is None:
+            wait = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+            time.sleep(wait)
+            dirty = list(self._files.values())
+        else:
+            events = self._inotify.read_events(timeout)
+            if any(mask & IN_Q_OVERFLOW for _, mask, _ in events):
+                dirty = list(self._files.values())
+            else:
+                changed = {
+                    self._wd_dirs[wd] / name
+                    for wd, _mask, name in events
+                    if wd in self._wd_dirs and name
+                }
+                dirty = [t for p, t in self._files.items() if p in changed]
+
+        out: List[LogLine] = []
+        for tracked in dirty:
+            out.extend(tracked.drain())
+        return out
+
+    def follow(self) -> Iterator[LogLine]:
+        """Generador infinito de líneas nuevas de todos los logs seguidos."""
+        while True:
+            yield from self.poll()
+
+    def close(self) -> None:
+        for tracked in self._files.values():
+            tracked.close()
+        self._files.clear()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self) -> "LogFollower":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,290 @@
+"""
+Formatos de log soportados y detección automática por archivo.
+
+Cada formato convierte una línea en un registro con las claves comunes
+"ts", "level" y "msg" (las mismas de LOG_PATTERN) más campos extra cuando
+el formato los trae: "status", "latency_ms", "method", "path", "client". Así todos
+los formatos alimentan la misma agregación en streaming (ver LogStats).
+
+Formatos incluidos:
+
+- bracket: "[2025-11-27 10:00:00] INFO mensaje" (el formato original).
+- json: un objeto JSON por línea. Usa orjson si está instalado.
+- logfmt: pares clave=valor ("level=info msg=\"...\" status=200").
+- nginx: access log "combined", con $request_time opcional al final.
+
+Para sumar un formato nuevo: subclase de LogFormat + register_format().
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+import json
+import math
+from pathlib import Path
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .log_reader import open_log
+
+try:
+    import orjson
+
+    _json_loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+LOG_PATTERN = re.compile(
+    r"^\[(?P<ts>.+?)\]\s+(?P<level>[A-Z]+)\s+(?P<msg>.*)$"
+)
+
+# Bytes que se leen del principio del archivo para detectar el formato
+DETECT_BYTES = 64 * 1024
+# Líneas no vacías que se prueban con cada formato
+DETECT_LINES = 50
+
+Record = Dict[str, Any]
+
+
+class LogFormat:
+    """Un formato de línea de log."""
+
+    name = ""
+
+    def parse(self, line: str) -> Optional[Record]:
+        """Registro de la línea, o None si la línea no es de este formato."""
+        raise NotImplementedError
+
+    def parse_bytes(self, raw: bytes) -> Optional[Record]:
+        """Como parse(), desde bytes crudos (sin el salto de línea)."""
+        return self.parse(raw.decode("utf-8", errors="ignore"))
+
+
+class BracketFormat(LogFormat):
+    name = "bracket"
+
+    def parse(self, line: str) -> Optional[Record]:
+        m = LOG_PATTERN.match(line.strip())
+        return m.groupdict() if m else None
+
+
+# Alias de claves en JSON / logfmt
+_TS_KEYS = ("ts", "time", "timestamp", "@timestamp", "datetime")
+_LEVEL_KEYS = ("level", "severity", "lvl", "loglevel")
+_MSG_KEYS = ("msg", "message", "event")
+_STATUS_KEYS = ("status", "status_code", "http_status")
+_PATH_KEYS = ("path", "endpoint", "route", "uri", "url")
+_CLIENT_KEYS = ("client", "client_ip", "remote_addr", "ip")
+# Latencias en milisegundos y en segundos
+_LATENCY_MS_KEYS = ("latency_ms", "duration_ms", "elapsed_ms", "response_time_ms", "took_ms")
+_LATENCY_S_KEYS = ("request_time", "latency", "duration", "elapsed", "response_time")
+
+
+def _first(data: Mapping[str, Any], keys) -> Any:
+    for key in keys:
+        value = data.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _norm_ts(value: Any) -> Optional[str]:
+    """Timestamp en el formato de los logs ("YYYY-MM-DD HH:MM:SS")."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Epoch en segundos o en milisegundos
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+        except (OverflowError, OSError, ValueError):
+            # Fuera de rango: la línea cuenta, pero sin timestamp
+            return None
+    return str(value).replace("T", " ")[:19]
+
+
+def _level_for_status(status: Optional[int]) -> str:
+    if status is None:
+        return "OTHER"
+    if status >= 500:
+        return "ERROR"
+    if status >= 400:
+        return "WARNING"
+    return "INFO"
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    # inf/nan romperían las sumas y el JSON de la respuesta
+    return number if math.isfinite(number) else None
+
+
+def record_from_mapping(data: Mapping[str, Any]) -> Optional[Record]:
+    """Registro común a partir de un objeto clave/valor (JSON o logfmt)."""
+    ts = _first(data, _TS_KEYS)
+    level = _first(data, _LEVEL_KEYS)
+    msg = _first(data, _MSG_KEYS)
+    if ts is None and level is None and msg is None:
+        return None
+
+    status = _to_int(_first(data, _STATUS_KEYS))
+    latency = _to_float(_first(data, _LATENCY_MS_KEYS))
+    if latency is None:
+        seconds = _to_float(_first(data, _LATENCY_S_KEYS))
+        latency = seconds * 1000.0 if seconds is not None else None
+
+    record: Record = {
+        "ts": _norm_ts(ts),
+        "level": str(level).upper() if level is not None else _level_for_status(status),
+        "msg": str(msg) if msg is not None else "",
+    }
+    if status is not None:
+        record["status"] = status
+    if latency is not None:
+        record["latency_ms"] = latency
+    path = _first(data, _PATH_KEYS)
+    if path is not None:
+        record["path"] = str(path)
+    method = data.get("method")
+    if method:
+        record["method"] = str(method)
+    client = _first(data, _CLIENT_KEYS)
+    if client is not None:
+        record["client"] = str(client)
+    return record
+
+
+class JsonFormat(LogFormat):
+    name = "json"
+
+    def parse_bytes(self, raw: bytes) -> Optional[Record]:
+        raw = raw.strip()
+        if not raw.startswith(b"{"):
+            return None
+        try:
+            data = _json_loads(raw)
+        except ValueError:
+            return None
+        return record_from_mapping(data) if isinstance(data, dict) else None
+
+    def parse(self, line: str) -> Optional[Record]:
+        return self.parse_bytes(line.encode("utf-8"))
+
+
+# Valor entre comillas "desenrollado" (sin alternancia por caracter)
+_LOGFMT_PAIR = re.compile(r'([\w.@-]+)=(?:"([^"\\]*(?:\\.[^"\\]*)*)"|(\S*))')
+
+
+class LogfmtFormat(LogFormat):
+    name = "logfmt"
+
+    def parse(self, line: str) -> Optional[Record]:
+        pairs = _LOGFMT_PAIR.findall(line)
+        if len(pairs) < 2:
+            return None
+        data = {key: quoted or bare for key, quoted, bare in pairs}
+        if "\\" in line:
+            for key, quoted, _ in pairs:
+                if "\\" in quoted:
+                    data[key] = quoted.replace('\\"', '"')
+        return record_from_mapping(data)
+
+
+_NGINX_PATTERN = re.compile(
+    r'^(?P<addr>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<request>[^"]*)" '
+    r"(?P<status>\d{3}) (?P<bytes>\d+|-)"
+    r'(?: "[^"]*" "[^"]*")?(?P<rest>.*)$'
+)
+_MONTHS = {
+    m: f"{i:02d}"
+    for i, m in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+
+class NginxFormat(LogFormat):
+    name = "nginx"
+
+    def parse(self, line: str) -> Optional[Record]:
+        m = _NGINX_PATTERN.match(line.strip())
+        if not m:
+            return None
+        # "27/Nov/2025:10:00:00 +0000" -> "2025-11-27 10:00:00" (hora local del log)
+        t = m["time"]
+        ts = f"{t[7:11]}-{_MONTHS.get(t[3:6], '00')}-{t[0:2]} {t[12:20]}"
+        status = int(m["status"])
+        parts = m["request"].split()
+
+        record: Record = {
+            "ts": ts,
+            "level": _level_for_status(status),
+            "msg": m["request"],
+            "status": status,
+            "client": m["addr"],
+        }
+        if len(parts) >= 2:
+            record["method"] = parts[0]
+            record["path"] = parts[1].split("?", 1)[0]
+        # $request_time (segundos con milésimas) al final del formato extendido
+        rest = m["rest"].split()
+        if rest and "." in rest[-1]:
+            seconds = _to_float(rest[-1])
+            if seconds is not None:
+                record["latency_ms"] = seconds * 1000.0
+        return record
+
+
+FORMATS: "OrderedDict[str, LogFormat]" = OrderedDict()
+
+
+def register_format(fmt: LogFormat) -> None:
+    """Agrega (o reemplaza) un formato. El orden define el desempate al detectar."""
+    FORMATS[fmt.name] = fmt
+
+
+for _fmt in (BracketFormat(), JsonFormat(), LogfmtFormat(), NginxFormat()):
+    register_format(_fmt)
+
+DEFAULT_FORMAT = FORMATS["bracket"]
+
+
+def get_format(name: Optional[str]) -> Optional[LogFormat]:
+    if name is None:
+        return None
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(
+            f"Formato desconocido: {name} (opciones: {', '.join(FORMATS)})"
+        ) from None
+
+
+def detect_format(log_path: Path) -> LogFormat:
+    """
+    Prueba cada formato con las primeras líneas del archivo y se queda con
+    el que parsea más. Sin líneas reconocibles, usa el formato original.
+    """
+    lines: List[bytes] = []
+    with open_log(log_path) as f:
+        for raw in f.read(DETECT_BYTES).split(b"\n"):
+            if raw.strip():
+                lines.append(raw)
+            if len(lines) >= DETECT_LINES:
+                break
+
+    best, best_hits = DEFAULT_FORMAT, 0
+    for fmt in FORMATS.values():
+        hits = sum(1 for raw in lines if fmt.parse_bytes(raw) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
@@ -0,0 +1,219 @@
+"""
+Índice temporal disperso para consultas por rango de tiempo.
+
+Los logs están ordenados por tiempo, así que alcanza con guardar un
+timestamp cada INDEX_STRIDE bytes para saltar directo a la ventana pedida
+(bisect sobre la lista de timestamps). Las líneas se leen con el LogFormat
+del archivo (ver log_formats), que normaliza los timestamps a
+"YYYY-MM-DD HH:MM:SS". El índice se guarda al lado del log
+(".archivo.log.tsidx", o ".archivo.log.<formato>.tsidx" fuera del formato
+original) y se extiende a medida que el log crece.
+"""
+
+import bisect
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .log_formats import DEFAULT_FORMAT, LogFormat, detect_format
+from .log_parser import LogStats
+
+# Una entrada del índice cada tantos bytes del log
+INDEX_STRIDE = 256 * 1024
+INDEX_VERSION = 1
+
+_RELATIVE = re.compile(r"^-?(?P<n>\d+)(?P<unit>[smhd])$")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def normalize_ts(value: Optional[str]) -> Optional[str]:
+    """
+    Lleva un límite de tiempo al formato del log ("YYYY-MM-DD HH:MM:SS").
+    Acepta ISO ("2025-11-27T10:00") y relativos a ahora ("15m", "2h", "1d").
+    """
+    if not value:
+        return None
+    value = value.strip()
+    m = _RELATIVE.match(value)
+    if m:
+        try:
+            delta = timedelta(**{_UNITS[m["unit"]]: int(m["n"])})
+            return (datetime.now() - delta).strftime("%Y-%m-%d %H:%M:%S")
+        except OverflowError:
+            raise ValueError(f"Rango de tiempo fuera de límites: {value}") from None
+    return value.replace("T", " ")
+
+
+def line_ts(raw: bytes, fmt: LogFormat = DEFAULT_FORMAT) -> Optional[str]:
+    record = fmt.parse_bytes(raw.rstrip(b"\n"))
+    return record["ts"] if record else None
+
+
+class TimeIndex:
+    """Lista ordenada de (timestamp, offset) de un log."""
+
+    def __init__(self, log_path: Path, fmt: LogFormat = DEFAULT_FORMAT) -> None:
+        self.log_path = log_path
+        self.fmt = fmt
+        suffix = "" if fmt is DEFAULT_FORMAT else f".{fmt.name}"
+        self.index_path = log_path.with_name(f".{log_path.name}{suffix}.tsidx")
+        self.inode: Optional[int] = None
+        # Tamaño del log en la última actualización y próximo salto a indexar
+        self.indexed_size = 0
+        self.next_mark = 0
+        self.timestamps: List[str] = []
+        self.offsets: List[int] = []
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("stride") != INDEX_STRIDE:
+            return
+        self.inode = data["inode"]
+        self.indexed_size = data["indexed_size"]
+        self.next_mark = data["next_mark"]
+        self.timestamps = [ts for ts, _ in data["entries"]]
+        self.offsets = [off for _, off in data["entries"]]
+
+    def _save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "stride": INDEX_STRIDE,
+            "inode": self.inode,
+            "indexed_size": self.indexed_size,
+            "next_mark": self.next_mark,
+            "entries": list(zip(self.timestamps, self.offsets)),
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except OSError:
+            # Carpeta de sólo lectura: el índice queda en memoria
+            pass
+
+    def _reset(self, inode: int) -> None:
+        self.inode = inode
+        self.indexed_size = 0
+        self.next_mark = 0
+        self.timestamps = []
+        self.offsets = []
+
+    def update(self) -> None:
+        """
+        Extiende el índice con lo agregado al log. No recorre el archivo
+        completo: salta de a INDEX_STRIDE bytes y toma el primer timestamp
+        parseable desde cada salto.
+        """
+        st = self.log_path.stat()
+        if st.st_ino != self.inode or st.st_size < self.indexed_size:
+            # Rotado o truncado: se reconstruye
+            self._reset(st.st_ino)
+
+        if st.st_size <= self.next_mark:
+            return
+
+        with self.log_path.open("rb") as f:
+            while self.next_mark < st.st_size:
+                f.seek(self.next_mark)
+                if self.next_mark:
+                    f.readline()  # descartar la línea cortada
+                offset = f.tell()
+                while offset < st.st_size:
+                    raw = f.readline()
+                    if not raw.endswith(b"\n"):
+                        break
+                    ts = line_ts(raw, self.fmt)
+                    if ts is not None:
+                        if not self.offsets or offset > self.offsets[-1]:
+                            self.timestamps.append(ts)
+                            self.offsets.append(offset)
+                        break
+                    offset += len(raw)
+                self.next_mark += INDEX_STRIDE
+        self.indexed_size = st.st_size
+        self._save()
+
+    def seek_offset(self, since: Optional[str]) -> int:
+        """Offset de una línea anterior o igual al primer ts >= since."""
+        if since is None or not self.timestamps:
+            return 0
+        i = bisect.bisect_left(self.timestamps, since) - 1
+        return self.offsets[i] if i >= 0 else 0
+
+
+_indexes: Dict[str, TimeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_time_index(log_path: Path, fmt: LogFormat = DEFAULT_FORMAT) -> TimeIndex:
+    key = f"{log_path.resolve()}:{fmt.name}"
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = TimeIndex(log_path, fmt)
+    with index.lock:
+        index.update()
+    return index
+
+
+def _in_until(ts: str, until: Optional[str]) -> bool:
+    # Comparación por prefijo: until="2025-11-27 10:15" incluye 10:15:59
+    return until is None or ts[: len(until)] <= until
+
+
+def query_time_range(
+    log_path: Path,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fmt: Optional[LogFormat] = None,
+) -> Dict[str, Any]:
+    """
+    Métricas (mismo formato que parse_log_file) de las líneas con
+    since <= ts <= until. Usa el índice para empezar a leer cerca de 'since'
+    y corta en la primera línea posterior a 'until'. El formato se detecta
+    si no se pasa 'fmt'.
+    """
+    if not log_path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    since = normalize_ts(since)
+    until = normalize_ts(until)
+    fmt = fmt or detect_format(log_path)
+    start = get_time_index(log_path, fmt).seek_offset(since)
+
+    stats = LogStats()
+    inside = since is None
+    with log_path.open("rb") as f:
+        f.seek(start)
+        for raw in f:
+            raw = raw.rstrip(b"\n")
+            record = fmt.parse_bytes(raw)
+            ts = record["ts"] if record else None
+            if ts:
+                if not inside:
+                    if ts < since:
+                        continue
+                    inside = True
+                if not _in_until(ts, until):
+                    break
+            elif not inside:
+                continue
+            if fmt is DEFAULT_FORMAT:
+                stats.add_line(raw.decode("utf-8", errors="ignore"))
+            else:
+                stats.add_record(record)
+
+    result = stats.as_dict()
+    result["since"] = since
+    result["until"] = until
+    return result
+
@@ -0,0 +1,570 @@
+"""
+Parser de logs en streaming.
+
+Lee el archivo línea por línea (una sola pasada) y acumula las métricas a
+medida que llegan, así el uso de memoria no depende del tamaño del log.
+El formato de cada archivo se detecta solo (ver log_formats); el formato
+original "[ts] LEVEL msg" tiene además un camino rápido sobre mmap.
+"""
+
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import mmap
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .log_formats import DEFAULT_FORMAT, LOG_PATTERN, LogFormat, detect_format
+from .log_reader import is_compressed, open_log
+from .log_rollup import LevelRollup
+from .sketches import HyperLogLog, SpaceSaving, TDigest
+
+
+# Versiones en bytes de LOG_PATTERN (aplicado sobre la línea con strip()),
+# para matchear directo sobre el mmap sin decodificar.
+# LINE_LEVEL_BYTES matchea todas las líneas y captura el nivel sólo en las
+# que cumplen el patrón (b"" en el resto), así un findall cuenta ambas cosas.
+_WS = rb"[ \t\r\f\v]"
+_LOG_LINE_BYTES = _WS + rb"*\[[^\n]+?\]" + _WS + rb"+([A-Z]+)" + _WS + rb"+[^\n]*\S"
+LINE_LEVEL_BYTES = re.compile(rb"^(?:" + _LOG_LINE_BYTES + rb")?[^\n]*$", re.MULTILINE)
+LOG_LINE_BYTES = re.compile(rb"^" + _LOG_LINE_BYTES + rb"[^\n]*$", re.MULTILINE)
+
+# Cantidad de líneas parseadas que se devuelven en "recent"
+RECENT_LIMIT = 20
+
+# Cantidad de endpoints / mensajes más frecuentes que se devuelven
+TOP_LIMIT = 10
+
+# Ventana (en bytes) que se procesa por vez en el camino rápido
+SCAN_WINDOW = 8 * 1024 * 1024
+
+# Por debajo de este tamaño no conviene levantar procesos
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def iter_log_lines(log_path: Path) -> Iterator[str]:
+    """
+    Generador de líneas decodificadas (sin el salto de línea final).
+    Lee en binario para no depender del buffer de texto; los logs rotados
+    comprimidos (.gz/.zst) se descomprimen en streaming.
+    """
+    with open_log(log_path) as f:
+        for raw in f:
+            yield raw.rstrip(b"\n").decode("utf-8", errors="ignore")
+
+
+def _merged(mine, other):
+    """Merge de sketches que se crean recién cuando hay datos (None = vacío)."""
+    if other is None:
+        return mine
+    if mine is None:
+        mine = type(other)()
+    mine.merge(other)
+    return mine
+
+
+class LogStats:
+    """
+    Acumulador de métricas de un log: total de líneas, conteo por nivel y
+    ventana acotada con las últimas líneas parseadas. Para formatos con
+    campos extra, también conteo por status, latencia (con percentiles),
+    endpoints y mensajes más frecuentes y clientes distintos; esos tres
+    últimos con sketches de memoria acotada (ver sketches).
+    """
+
+    def __init__(self, recent_limit: int = RECENT_LIMIT) -> None:
+        self.total_lines = 0
+        self.level_counts: Counter[str] = Counter()
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_limit)
+        self.status_counts: Counter[str] = Counter()
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.latency_digest: Optional[TDigest] = None
+        self.top_paths: Optional[SpaceSaving] = None
+        self.top_messages: Optional[SpaceSaving] = None
+        self.clients: Optional[HyperLogLog] = None
+
+    def add_line(self, line: str) -> None:
+        self.total_lines += 1
+        m = LOG_PATTERN.match(line.strip())
+        if not m:
+            # Línea que no matchea el patrón, la ignoramos en las métricas
+            return
+
+        data = m.groupdict()
+        self.level_counts[data["level"]] += 1
+        self.recent.append(data)
+
+    def add_record(self, record: Optional[Dict[str, Any]]) -> None:
+        """Como add_line, con la línea ya parseada por un LogFormat (None si no matcheó)."""
+        self.total_lines += 1
+        if record is None:
+            return
+
+        self.level_counts[record["level"]] += 1
+        status = record.get("status")
+        if status is not None:
+            self.status_counts[str(status)] += 1
+        latency = record.get("latency_ms")
+        if latency is not None:
+            self.latency_count += 1
+            self.latency_sum += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+            if self.latency_digest is None:
+                self.latency_digest = TDigest()
+            self.latency_digest.add(latency)
+        path = record.get("path")
+        if path is not None:
+            if self.top_paths is None:
+                self.top_paths = SpaceSaving()
+            self.top_paths.add(path)
+        client = record.get("client")
+        if client is not None:
+            if self.clients is None:
+                self.clients = HyperLogLog()
+            self.clients.add(client)
+        if record["msg"]:
+            if self.top_messages is None:
+                self.top_messages = SpaceSaving()
+            self.top_messages.add(record["msg"])
+        self.recent.append(record)
+
+    def copy(self) -> "LogStats":
+        clone = LogStats(self.recent.maxlen or RECENT_LIMIT)
+        clone.merge(self)
+        return clone
+
+    def merge(self, other: "LogStats") -> None:
+        """Suma las métricas de 'other', que corresponde a líneas posteriores."""
+        self.total_lines += other.total_lines
+        self.level_counts.update(other.level_counts)
+        self.recent.extend(other.recent)
+        self.status_counts.update(other.status_counts)
+        self.latency_count += other.latency_count
+        self.latency_sum += other.latency_sum
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.latency_digest = _merged(self.latency_digest, other.latency_digest)
+        self.top_paths = _merged(self.top_paths, other.top_paths)
+        self.top_messages = _merged(self.top_messages, other.top_messages)
+        self.clients = _merged(self.clients, other.clients)
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "total_lines": self.total_lines,
+            "level_counts": dict(self.level_counts),
+            "recent": list(self.recent),
+        }
+        # Sólo formatos con campos extra (json, logfmt, nginx)
+        fields: Dict[str, Any] = {}
+        if self.status_counts:
+            fields["status"] = dict(self.status_counts)
+        if self.latency_count:
+            fields["latency_ms"] = {
+                "count": self.latency_count,
+                "sum": self.latency_sum,
+                "avg": self.latency_sum / self.latency_count,
+                "max": self.latency_max,
+            }
+            if self.latency_digest is not None:
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                    fields["latency_ms"][name] = self.latency_digest.quantile(q)
+        if self.top_paths is not None:
+            fields["top_paths"] = self.top_paths.top(TOP_LIMIT)
+        if self.top_messages is not None:
+            fields["top_messages"] = self.top_messages.top(TOP_LIMIT)
+        if self.clients is not None:
+            fields["distinct_clients"] = self.clients.estimate()
+        if fields:
+            result["fields"] = fields
+        return result
+
+
+def parse_log_file(log_path: Path, fmt: Optional[LogFormat] = None) -> Dict[str, Any]:
+    """
+    Parsea un archivo de log con líneas del estilo:
+    [2025-11-27 10:00:00] INFO Mensaje...
+    o de otro formato registrado (detectado solo si no se pasa 'fmt').
+
+    Devuelve métricas + últimas líneas parseadas.
+    """
+    if not log_path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    fmt = fmt or detect_format(log_path)
+    stats = LogStats()
+    if fmt is DEFAULT_FORMAT:
+        for line in iter_log_lines(log_path):
+            stats.add_line(line)
+    else:
+        parse = fmt.parse_bytes
+        with open_log(log_path) as f:
+            for raw in f:
+                stats.add_record(parse(raw.rstrip(b"\n")))
+
+    return stats.as_dict()
+
+
+def _window_ends(buf, start: int, end: int, window: int) -> Iterator[Tuple[int, int]]:
+    """Ventanas [a, b) de ~window bytes cortadas en un salto de línea."""
+    pos = start
+    while pos < end:
+        cut = -1
+        if pos + window < end:
+            cut = buf.find(b"\n", pos + window, end)
+        if cut < 0:
+            cut = end
+            if buf[end - 1:end] == b"\n":
+                cut = end - 1
+        yield pos, cut
+        pos = cut + 1
+
+
+def scan_range(buf, start: int, end: int, recent_limit: int = RECENT_LIMIT) -> LogStats:
+    """
+    Camino rápido sobre un buffer de bytes (mmap) para [start, end).
+
+    Cuenta líneas y niveles con un findall en C por ventana, sin decodificar
+    ni armar un dict por línea. Sólo se decodifican las líneas que terminan
+    en la ventana "recent". 'end' tiene que caer en inicio de línea o en EOF.
+    """
+    stats = LogStats(recent_limit)
+    level_counts: Counter[bytes] = Counter()
+    windows = list(_window_ends(buf, start, end, SCAN_WINDOW))
+    for a, b in windows:
+        levels = LINE_LEVEL_BYTES.findall(buf, a, b)
+        stats.total_lines += len(levels)
+        level_counts.update(levels)
+
+    level_counts.pop(b"", None)
+    stats.level_counts = Counter(
+        {level.decode("ascii"): count for level, count in level_counts.items()}
+    )
+
+    # "recent": recorremos ventanas desde el final hasta juntar suficientes
+    wanted = min(recent_limit, sum(level_counts.values()))
+    spans: List[Tuple[int, int]] = []
+    for a, b in reversed(windows):
+        if len(spans) >= wanted:
+            break
+        found = [m.span() for m in LOG_LINE_BYTES.finditer(buf, a, b)]
+        spans[:0] = found[-(wanted - len(spans)):]
+
+    for a, b in spans[-wanted:] if wanted else []:
+        line = bytes(buf[a:b]).decode("utf-8", errors="ignore")
+        m = LOG_PATTERN.match(line.strip())
+        if m:
+            stats.recent.append(m.groupdict())
+    return stats
+
+
+def scan_records(
+    buf,
+    start: int,
+    end: int,
+    fmt: LogFormat,
+    rollup: Optional[LevelRollup] = None,
+    stats: Optional[LogStats] = None,
+) -> LogStats:
+    """
+    Equivalente de scan_range para formatos sin camino rápido: parsea cada
+    línea de buf[start:end) con 'fmt', de a una ventana por vez. Si se pasa
+    'rollup', también suma las líneas a los histogramas.
+    """
+    stats = stats if stats is not None else LogStats()
+    parse = fmt.parse_bytes
+    for a, b in _window_ends(buf, start, end, SCAN_WINDOW):
+        minutes: Counter[Tuple[str, str]] = Counter()
+        for raw in bytes(buf[a:b]).split(b"\n"):
+            record = parse(raw)
+            stats.add_record(record)
+            if rollup is not None and record is not None and record["ts"]:
+                minutes[record["ts"][:16], record["level"]] += 1
+        if rollup is not None:
+            for (minute, level), count in sorted(minutes.items()):
+                rollup.add(minute, level, count)
+    if rollup is not None:
+        rollup.prune()
+    return stats
+
+
+def scan_file(log_path: Path, start: int = 0, end: Optional[int] = None) -> LogStats:
+    """scan_range sobre el archivo mapeado en memoria (sin copiarlo)."""
+    with log_path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if end <= start:
+            return LogStats()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return scan_range(mm, start, end)
+
+
+def parse_log_stats(log_path: Path, fmt: Optional[LogFormat] = None) -> LogStats:
+    """
+    Métricas del archivo completo como LogStats (se pueden combinar con
+    merge, sketches incluidos). Usa mmap salvo en los comprimidos.
+    """
+    if not log_path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+    fmt = fmt or detect_format(log_path)
+    if is_compressed(log_path):
+        stats = LogStats()
+        with open_log(log_path) as f:
+            for raw in f:
+                if fmt is DEFAULT_FORMAT:
+                    stats.add_line(raw.rstrip(b"\n").decode("utf-8", errors="ignore"))
+                else:
+                    stats.add_record(fmt.parse_bytes(raw.rstrip(b"\n")))
+        return stats
+    if fmt is DEFAULT_FORMAT:
+        return scan_file(log_path)
+    with log_path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return LogStats()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return scan_records(mm, 0, size, fmt)
+
+
+def parse_log_file_fast(log_path: Path) -> Dict[str, Any]:
+    """Mismo resultado que parse_log_file, usando el camino rápido con mmap."""
+    return parse_log_stats(log_path).as_dict()
+
+
+def split_ranges(log_path: Path, parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide el archivo en 'parts' rangos de bytes [inicio, fin) alineados a
+    inicio de línea.
+    """
+    size = log_path.stat().st_size
+    parts = max(1, min(parts, size))
+    bounds = [0]
+    with log_path.open("rb") as f:
+        for i in range(1, parts):
+            pos = max(size * i // parts, bounds[-1])
+            f.seek(pos)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def parse_range(log_path: Path, start: int, end: int) -> LogStats:
+    """Parsea las líneas que empiezan dentro de [start, end)."""
+    return scan_file(log_path, start, end)
+
+
+def _parse_range_job(job: Tuple[str, int, int]) -> LogStats:
+    path, start, end = job
+    return parse_range(Path(path), start, end)
+
+
+def parse_log_file_parallel(
+    log_path: Path, workers: Optional[int] = None, fmt: Optional[LogFormat] = None
+) -> Dict[str, Any]:
+    """
+    Igual que parse_log_file pero repartiendo rangos del archivo entre un
+    pool de procesos. Los parciales se combinan en orden, así "recent"
+    sigue siendo la cola real del archivo. Sólo el formato original se
+    reparte; los demás se parsean en un proceso.
+    """
+    if not log_path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    workers = workers or os.cpu_count() or 1
+    fmt = fmt or detect_format(log_path)
+    if fmt is not DEFAULT_FORMAT or workers <= 1 or log_path.stat().st_size < PARALLEL_MIN_BYTES:
+        return parse_log_stats(log_path, fmt).as_dict()
+
+    jobs = [(str(log_path), a, b) for a, b in split_ranges(log_path, workers * 4)]
+    stats = LogStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_parse_range_job, jobs):
+            stats.merge(partial)
+    return stats.as_dict()
+
+
+@dataclass
+class _CacheEntry:
+    inode: int
+    size: int
+    mtime_ns: int
+    # Offset en bytes hasta la última línea completa ya procesada
+    offset: int
+    stats: LogStats
+    # Resultado ya armado (incluye una posible última línea sin "\n")
+    result: Optional[Dict[str, Any]] = None
+    current: Optional[LogStats] = None
+    # Histogramas por minuto/hora/día; se crean la primera vez que se piden
+    rollup: Optional[LevelRollup] = None
+    fmt: LogFormat = DEFAULT_FORMAT
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class LogStatsCache:
+    """
+    Cache LRU de métricas por archivo.
+
+    Guarda offset, inodo y tamaño del último parseo; en la siguiente consulta
+    sólo se leen los bytes agregados al final. Si cambia el inodo (rotación)
+    o el archivo se achica (truncado) se reconstruye desde cero.
+    """
+
+    def __init__(self, max_files: int = 32) -> None:
+        self.max_files = max_files
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry_for(
+        self, log_path: Path, st: os.stat_result, fmt: Optional[LogFormat]
+    ) -> _CacheEntry:
+        # Una entrada por formato pedido: None = detectado automáticamente, así
+        # un ?format= explícito no cambia el parser de las consultas sin formato
+        key = (str(log_path.resolve()), fmt.name if fmt is not None else None)
+        with self._lock:
+            entry = self._entries.get(key)
+            stale = (
+                entry is None
+                or entry.inode != st.st_ino
+                or st.st_size < entry.size
+            )
+            detected = fmt
+            if fmt is None and (stale or not entry.stats.level_counts):
+                # Mientras no haya registros parseados (archivo vacío o con
+                # líneas que no matchean) se vuelve a detectar el formato
+                detected = detect_format(log_path)
+                stale = stale or detected is not entry.fmt
+            if stale:
+                entry = _CacheEntry(
+                    inode=st.st_ino,
+                    size=0,
+                    mtime_ns=0,
+                    offset=0,
+                    stats=LogStats(),
+                    fmt=detected,
+                )
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_files:
+                self._entries.popitem(last=False)
+            return entry
+
+    def _refresh(
+        self, log_path: Path, with_rollup: bool = False, fmt: Optional[LogFormat] = None
+    ) -> _CacheEntry:
+        """
+        Pone al día la entrada del archivo leyendo sólo los bytes nuevos.
+        Devuelve la entrada con su lock tomado. Sin 'fmt', el formato se
+        detecta hasta que haya registros parseados y queda fijo en la entrada.
+        """
+        if not log_path.exists():
+            raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+        st = log_path.stat()
+        entry = self._entry_for(log_path, st, fmt)
+        entry.lock.acquire()
+
+        try:
+            unchanged = entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns
+            needs_rollup = with_rollup and entry.rollup is None
+            if entry.result is not None and unchanged and not needs_rollup:
+                return entry
+
+            pending = b""
+            with log_path.open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if needs_rollup:
+                    entry.rollup = LevelRollup()
+                if size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if needs_rollup:
+                            self._add_rollup(entry, mm, 0, entry.offset)
+                        # Sólo se confirma hasta la última línea completa; una
+                        # línea incompleta no avanza el offset del cache
+                        committed = mm.rfind(b"\n", entry.offset, size) + 1
+                        if committed > entry.offset:
+                            if entry.fmt is DEFAULT_FORMAT:
+                                entry.stats.merge(scan_range(mm, entry.offset, committed))
+                                if entry.rollup is not None:
+                                    entry.rollup.add_range(mm, entry.offset, committed)
+                            else:
+                                scan_records(
+                                    mm, entry.offset, committed, entry.fmt,
+                                    rollup=entry.rollup, stats=entry.stats,
+                                )
+                            entry.offset = committed
+                        pending = mm[entry.offset:size]
+
+            stats = entry.stats
+            if pending:
+                stats = stats.copy()
+                if entry.fmt is DEFAULT_FORMAT:
+                    stats.add_line(pending.decode("utf-8", errors="ignore"))
+                else:
+                    stats.add_record(entry.fmt.parse_bytes(pending))
+
+            entry.size = entry.offset + len(pending)
+            entry.mtime_ns = st.st_mtime_ns
+            entry.current = stats
+            entry.result = stats.as_dict()
+            return entry
+        except BaseException:
+            entry.lock.release()
+            raise
+
+    @staticmethod
+    def _add_rollup(entry: _CacheEntry, buf, start: int, end: int) -> None:
+        if entry.fmt is DEFAULT_FORMAT:
+            entry.rollup.add_range(buf, start, end)
+        elif end > start:
+            scan_records(buf, start, end, entry.fmt, rollup=entry.rollup)
+
+    def parse(self, log_path: Path, fmt: Optional[LogFormat] = None) -> Dict[str, Any]:
+        """Igual que parse_log_file, pero incremental sobre el cache."""
+        entry = self._refresh(log_path, fmt=fmt)
+        try:
+            return entry.result
+        finally:
+            entry.lock.release()
+
+    def stats(self, log_path: Path, fmt: Optional[LogFormat] = None) -> LogStats:
+        """Como parse(), pero una copia del LogStats (para combinar con otros)."""
+        entry = self._refresh(log_path, fmt=fmt)
+        try:
+            return entry.current.copy()
+        finally:
+            entry.lock.release()
+
+    def format_of(self, log_path: Path) -> str:
+        """Nombre del formato con el que se está parseando el archivo."""
+        entry = self._refresh(log_path)
+        try:
+            return entry.fmt.name
+        finally:
+            entry.lock.release()
+
+    def histogram(
+        self,
+        log_path: Path,
+        resolution: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fmt: Optional[LogFormat] = None,
+    ) -> Dict[str, Any]:
+        """Conteos por nivel y por bucket de tiempo (ver LevelRollup)."""
+        entry = self._refresh(log_path, with_rollup=True, fmt=fmt)
+        try:
+            return entry.rollup.histogram(resolution, since, until)
+        finally:
+            entry.lock.release()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+stats_cache = LogStatsCache()
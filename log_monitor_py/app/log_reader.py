@@ -0,0 +1,125 @@
+"""
+Lectura de logs a bajo nivel (tail) compartida por la web y el CLI.
+"""
+
+from collections import deque
+import gzip
+import io
+import os
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+# Extensiones de logs rotados comprimidos que se leen en streaming
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+# Tamaño de bloque para leer el archivo desde el final hacia atrás
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def is_compressed(log_path: Path) -> bool:
+    return log_path.suffix in COMPRESSED_SUFFIXES
+
+
+def open_log(log_path: Path) -> BinaryIO:
+    """
+    Abre un log en binario. Los .gz/.zst se descomprimen en streaming
+    (.zst requiere el paquete opcional 'zstandard').
+    """
+    if log_path.suffix == ".gz":
+        return gzip.open(log_path, "rb")
+    if log_path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError(
+                "Para leer logs .zst hay que instalar el paquete 'zstandard'"
+            ) from exc
+        reader = zstandard.ZstdDecompressor().stream_reader(log_path.open("rb"), closefd=True)
+        return io.BufferedReader(reader)
+    return log_path.open("rb")
+
+
+def tail_offset(
+    log_path: Path,
+    lines: int,
+    end: Optional[int] = None,
+    block_size: int = TAIL_BLOCK_SIZE,
+) -> int:
+    """
+    Devuelve el offset en bytes donde empiezan las últimas 'lines' líneas
+    anteriores a 'end' (por defecto, el final del archivo).
+
+    Lee bloques de tamaño fijo desde el final (seek hacia atrás) hasta juntar
+    suficientes saltos de línea, así el costo depende de N y no del tamaño
+    del log.
+    """
+    with log_path.open("rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size if end is None else min(end, size)
+        if lines <= 0:
+            return end
+
+        pos = end
+        # El "\n" final no abre una línea nueva
+        skip_trailing = True
+        needed = lines
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            if skip_trailing:
+                skip_trailing = False
+                if chunk.endswith(b"\n"):
+                    chunk = chunk[:-1]
+            idx = len(chunk)
+            while True:
+                idx = chunk.rfind(b"\n", 0, idx)
+                if idx < 0:
+                    break
+                needed -= 1
+                if needed == 0:
+                    return pos + idx + 1
+    return 0
+
+
+def read_lines(log_path: Path, start: int, end: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    Lee las líneas completas entre 'start' y 'end' (por defecto EOF).
+    Devuelve tuplas (offset al final de la línea, texto).
+    """
+    with log_path.open("rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(max(0, end - start))
+
+    out: List[Tuple[int, str]] = []
+    offset = start
+    for raw in data.split(b"\n")[:-1]:
+        offset += len(raw) + 1
+        out.append((offset, raw.decode("utf-8", errors="ignore").rstrip("\r")))
+    return out
+
+
+def tail_lines(log_path: Path, lines: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """Devuelve las últimas 'lines' líneas del archivo (ver tail_offset)."""
+    if lines <= 0:
+        return []
+
+    if is_compressed(log_path):
+        # No se puede leer hacia atrás: se recorre el stream una vez
+        tail: "deque[bytes]" = deque(maxlen=lines)
+        with open_log(log_path) as f:
+            for raw in f:
+                tail.append(raw.rstrip(b"\n"))
+        return [raw.decode("utf-8", errors="ignore").rstrip("\r") for raw in tail]
+
+    start = tail_offset(log_path, lines, block_size=block_size)
+    with log_path.open("rb") as f:
+        f.seek(start)
+        data = f.read()
+
+    if not data:
+        return []
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return [raw.decode("utf-8", errors="ignore").rstrip("\r") for raw in data.split(b"\n")]
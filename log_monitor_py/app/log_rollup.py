@@ -0,0 +1,108 @@
+"""
+Histogramas de niveles por minuto, hora y día.
+
+Cada resolución es una tabla de buckets (clave = prefijo del timestamp,
+ej. "2025-11-27 10:01") con un array('I') de contadores por nivel. Los
+niveles se guardan tal como vienen en el log ("WARN", "TRACE", ...), igual
+que en LogStats: los de LEVELS van primero y el resto se agrega al
+aparecer. Las tablas se actualizan a medida que se parsea el log y tienen
+retención acotada, así meses de historia entran en poca memoria.
+"""
+
+from array import array
+from collections import Counter
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Orden inicial de las columnas; otros niveles se agregan al final
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# resolución -> (largo del prefijo del timestamp, buckets retenidos)
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "minute": (16, 2 * 24 * 60),  # 2 días
+    "hour": (13, 90 * 24),  # 90 días
+    "day": (10, 3 * 366),  # ~3 años
+}
+
+# Igual que LOG_PATTERN en bytes, capturando el minuto del timestamp y el nivel
+_WS = rb"[ \t\r\f\v]"
+ROLLUP_LINE_BYTES = re.compile(
+    rb"^" + _WS + rb"*\[(\d{4}-\d\d-\d\d[ T]\d\d:\d\d)[^\n]*?\]"
+    + _WS + rb"+([A-Z]+)" + _WS + rb"+[^\n]*\S",
+    re.MULTILINE,
+)
+
+
+class LevelRollup:
+    """Contadores por nivel pre-agregados por minuto/hora/día."""
+
+    def __init__(self) -> None:
+        self.tables: Dict[str, Dict[str, array]] = {name: {} for name in RESOLUTIONS}
+        self.levels: List[str] = list(LEVELS)
+        self._level_index: Dict[str, int] = {level: i for i, level in enumerate(LEVELS)}
+
+    def _index(self, level: str) -> int:
+        idx = self._level_index.get(level)
+        if idx is None:
+            idx = self._level_index[level] = len(self.levels)
+            self.levels.append(level)
+        return idx
+
+    def _bucket(self, table: Dict[str, array], key: str) -> array:
+        """Contadores del bucket, con lugar para todos los niveles conocidos."""
+        counts = table.get(key)
+        if counts is None:
+            counts = table[key] = array("I", bytes(4 * len(self.levels)))
+        elif len(counts) < len(self.levels):
+            counts.extend([0] * (len(self.levels) - len(counts)))
+        return counts
+
+    def add(self, minute: str, level: str, count: int = 1) -> None:
+        idx = self._index(level)
+        minute = minute.replace("T", " ")
+        for name, (width, _) in RESOLUTIONS.items():
+            self._bucket(self.tables[name], minute[:width])[idx] += count
+
+    def add_range(self, buf, start: int, end: int) -> None:
+        """Suma las líneas de buf[start:end) (bytes o mmap) a los buckets."""
+        grouped = Counter(ROLLUP_LINE_BYTES.findall(buf, start, end))
+        for (minute, level), count in sorted(grouped.items()):
+            self.add(minute.decode("ascii"), level.decode("ascii"), count)
+        self.prune()
+
+    def prune(self) -> None:
+        """Aplica la retención: descarta los buckets más viejos."""
+        for name, (_, keep) in RESOLUTIONS.items():
+            table = self.tables[name]
+            if len(table) > keep:
+                for key in sorted(table)[: len(table) - keep]:
+                    del table[key]
+
+    def merge(self, other: "LevelRollup") -> None:
+        # Columnas de 'other' -> columnas propias (por nombre de nivel)
+        columns = [self._index(level) for level in other.levels]
+        for name, table in other.tables.items():
+            mine = self.tables[name]
+            for key, counts in table.items():
+                current = self._bucket(mine, key)
+                for i, value in enumerate(counts):
+                    if value:
+                        current[columns[i]] += value
+        self.prune()
+
+    def histogram(
+        self, resolution: str, since: Optional[str] = None, until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        width, _ = RESOLUTIONS[resolution]
+        table = self.tables[resolution]
+        lo = since[:width] if since else None
+        hi = until[:width] if until else None
+
+        buckets: List[Dict[str, Any]] = []
+        for key in sorted(table):
+            if (lo and key < lo) or (hi and key > hi):
+                continue
+            counts = table[key].tolist()
+            counts.extend([0] * (len(self.levels) - len(counts)))
+            buckets.append({"bucket": key, "counts": counts})
+        return {"resolution": resolution, "levels": list(self.levels), "buckets": buckets}
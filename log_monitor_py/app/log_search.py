@@ -0,0 +1,279 @@
+"""
+Búsqueda full-text sobre los mensajes de un log.
+
+El índice invertido (token -> offset de la línea) es una tabla FTS5 de
+SQLite sin contenido: sólo guarda los tokens y usa como rowid el offset en
+bytes de cada línea, y el texto se vuelve a leer del log al mostrar
+resultados. Se guarda al lado del log (".archivo.log.search.db") y se
+extiende sólo con las líneas agregadas desde la última búsqueda. Las líneas
+se parsean con el LogFormat del archivo (ver log_formats), detectado al
+empezar a indexar y guardado en el índice.
+
+La indexación corre en un hilo propio, fuera del pedido: cada búsqueda la
+pone en marcha y espera como mucho SEARCH_WAIT segundos; si el índice no
+terminó (la primera vez sobre un log grande) se busca en lo ya indexado y la
+respuesta lo indica con "indexing": true.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .log_formats import DEFAULT_FORMAT, FORMATS, LogFormat, detect_format
+
+# Filas por transacción al indexar
+INSERT_BATCH = 10_000
+# Segundos que una búsqueda espera a que el índice se ponga al día
+SEARCH_WAIT = 0.5
+# Comienzos de los errores de SQLite causados por la consulta FTS5 del usuario
+# (el resto, como "database is locked", son fallas del server)
+QUERY_ERRORS = (
+    "fts5: syntax error",
+    "no such column",
+    "unterminated string",
+    "unknown special query",
+    "expected integer",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS lines (offset INTEGER PRIMARY KEY, ts TEXT, level TEXT);
+"""
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts "
+    "USING fts5(body, content='', tokenize='unicode61')"
+)
+
+
+class SearchIndex:
+    """Índice FTS5 incremental de un archivo de log."""
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.db_path = log_path.with_name(f".{log_path.name}.search.db")
+        # Una conexión para el hilo indexador y otra para las búsquedas; con
+        # WAL las búsquedas ven el último lote confirmado sin esperar al resto
+        self.conn = self._connect()
+        self.reader = self._connect()
+        self.fmt: LogFormat = FORMATS.get(self._meta("format") or "", DEFAULT_FORMAT)
+        # Búsquedas (conexión self.reader) y reconstrucción del índice
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.execute(_FTS_SCHEMA)
+        return conn
+
+    def _meta(self, key: str, conn: Optional[sqlite3.Connection] = None) -> Any:
+        row = (conn or self.conn).execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _reset(self) -> None:
+        # Una tabla FTS5 sin contenido no admite DELETE: se vuelve a crear.
+        # Con self.lock tomado, para que ninguna búsqueda la lea a medias
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM meta")
+            self.conn.execute("DELETE FROM lines")
+            self.conn.execute("DROP TABLE IF EXISTS lines_fts")
+            self.conn.execute(_FTS_SCHEMA)
+
+    def _insert(self, rows: List[tuple], offset: int) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO lines (offset, ts, level) VALUES (?, ?, ?)",
+                [(off, ts, level) for off, ts, level, _ in rows],
+            )
+            self.conn.executemany(
+                "INSERT INTO lines_fts (rowid, body) VALUES (?, ?)",
+                [(off, body) for off, _, _, body in rows],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (offset,)
+            )
+
+    def update(self) -> None:
+        """Indexa las líneas completas agregadas desde la última vez."""
+        st = self.log_path.stat()
+        inode = self._meta("inode")
+        offset = self._meta("offset") or 0
+        if inode != st.st_ino or st.st_size < offset or (offset and self._meta("format") is None):
+            # Rotado, truncado o armado antes de guardar el formato: se reconstruye
+            self._reset()
+            offset = 0
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('inode', ?)", (st.st_ino,)
+                )
+        if st.st_size == offset:
+            return
+        if offset == 0:
+            # Recién con datos se sabe el formato (un log vacío no dice nada)
+            self.fmt = detect_format(self.log_path)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('format', ?)",
+                    (self.fmt.name,),
+                )
+
+        rows: List[tuple] = []
+        with self.log_path.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                record = self.fmt.parse_bytes(raw[:-1])
+                if record is not None:
+                    # El nivel también se indexa: "timeout AND ERROR" funciona
+                    body = f"{record['level']} {record['msg']}"
+                    rows.append((offset, record["ts"], record["level"], body))
+                else:
+                    line = raw[:-1].decode("utf-8", errors="ignore").strip()
+                    if line:
+                        rows.append((offset, None, None, line))
+                offset += len(raw)
+                if len(rows) >= INSERT_BATCH:
+                    self._insert(rows, offset)
+                    rows = []
+        self._insert(rows, offset)
+
+    def _run(self) -> None:
+        try:
+            self.update()
+        except OSError:
+            # El log desapareció o no se puede leer: lo reporta la búsqueda
+            pass
+        finally:
+            with self._thread_lock:
+                self._thread = None
+                self._idle.set()
+
+    def refresh(self) -> threading.Event:
+        """
+        Pone en marcha la indexación en segundo plano (si no está corriendo).
+        Devuelve un evento que se activa cuando el índice queda al día.
+        """
+        with self._thread_lock:
+            if self._thread is None:
+                self._idle.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="log-search-index", daemon=True
+                )
+                self._thread.start()
+        return self._idle
+
+    def _stale(self) -> bool:
+        """True si el índice corresponde a un log ya rotado o truncado."""
+        st = self.log_path.stat()
+        inode = self._meta("inode", self.reader)
+        return inode is not None and (
+            inode != st.st_ino or st.st_size < (self._meta("offset", self.reader) or 0)
+        )
+
+    def search(
+        self,
+        query: str,
+        level: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        before: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Busca 'query' (sintaxis FTS5: AND, OR, NOT, "frases", prefijo*).
+        Resultados del más nuevo al más viejo; para la página siguiente se
+        pasa before=<next_before> de la respuesta anterior.
+        """
+        sql = [
+            "SELECT l.offset, l.ts, l.level FROM lines_fts f",
+            "JOIN lines l ON l.offset = f.rowid",
+            "WHERE lines_fts MATCH ?",
+        ]
+        params: List[Any] = [query]
+        if level:
+            sql.append("AND l.level = ?")
+            params.append(level.upper())
+        if since:
+            sql.append("AND l.ts >= ?")
+            params.append(since)
+        if until:
+            # Comparación por prefijo, igual que en /api/logs
+            sql.append("AND substr(l.ts, 1, ?) <= ?")
+            params.extend([len(until), until])
+        if before is not None:
+            sql.append("AND f.rowid < ?")
+            params.append(before)
+        sql.append("ORDER BY f.rowid DESC LIMIT ?")
+        params.append(limit + 1)
+
+        if self._stale():
+            # Los offsets ya no apuntan al log actual: hasta reconstruir, nada
+            return {"query": query, "hits": [], "next_before": None}
+        try:
+            rows = self.reader.execute(" ".join(sql), params).fetchall()
+        except sqlite3.OperationalError as exc:
+            if str(exc).startswith(QUERY_ERRORS):
+                raise ValueError(f"Búsqueda inválida: {exc}") from None
+            raise
+        page = rows[:limit]
+
+        hits = []
+        with self.log_path.open("rb") as f:
+            for offset, ts, lvl in page:
+                f.seek(offset)
+                raw = f.readline().rstrip(b"\n")
+                record = self.fmt.parse_bytes(raw)
+                hits.append(
+                    {
+                        "offset": offset,
+                        "ts": ts,
+                        "level": lvl,
+                        "msg": record["msg"] if record else raw.decode("utf-8", errors="ignore"),
+                    }
+                )
+
+        return {
+            "query": query,
+            "hits": hits,
+            "next_before": page[-1][0] if len(rows) > limit else None,
+        }
+
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def search_log(
+    log_path: Path,
+    query: str,
+    level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[int] = None,
+    wait: Optional[float] = SEARCH_WAIT,
+) -> Dict[str, Any]:
+    """
+    Pone al día el índice del log (en segundo plano, esperando como mucho
+    'wait' segundos; None espera a que termine) y ejecuta la búsqueda.
+    """
+    if not log_path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {log_path}")
+
+    key = str(log_path.resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SearchIndex(log_path)
+    idle = index.refresh()
+    idle.wait(wait)
+    with index.lock:
+        result = index.search(query, level, since, until, limit, before)
+    result["indexing"] = not idle.is_set()
+    return result
@@ -0,0 +1,158 @@
+"""
+Stream en vivo de logs (server-sent events) para el dashboard.
+
+Un único LogFollower, en un thread de fondo, sigue todos los logs que tienen
+al menos un cliente conectado y reparte cada línea nueva a todos los
+suscriptores. Cada cliente tiene una cola acotada: si se atrasa (la cola se
+llena) se le corta el stream y el navegador reconecta reanudando desde el
+último offset recibido (Last-Event-ID).
+"""
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Dict, List, Optional, Set, Tuple
+
+from .log_follower import LogFollower
+from .log_reader import read_lines, tail_offset
+
+# Líneas encoladas por cliente antes de considerarlo atrasado
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Máximo de bytes a reenviar al reanudar desde un offset viejo
+MAX_REPLAY_BYTES = 1024 * 1024
+# Cada cuánto el thread revisa altas/bajas de suscriptores
+HUB_POLL_TIMEOUT = 0.25
+
+
+class Subscriber:
+    """Un cliente conectado al stream de un log."""
+
+    def __init__(self, path: Path, loop: asyncio.AbstractEventLoop) -> None:
+        self.path = path
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[int, str]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+        self.closed = False
+
+    def _push(self, items: List[Tuple[int, str]]) -> None:
+        # Corre en el event loop (call_soon_threadsafe)
+        for item in items:
+            if self.lagged:
+                return
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.lagged = True
+
+    def push(self, items: List[Tuple[int, str]]) -> None:
+        self.loop.call_soon_threadsafe(self._push, items)
+
+    def _close(self) -> None:
+        self.closed = True
+        # Despierta al consumidor que está esperando en la cola
+        try:
+            self.queue.put_nowait((-1, ""))
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    def close(self) -> None:
+        """Corta el stream de este cliente (p. ej. el log no se pudo abrir)."""
+        self.loop.call_soon_threadsafe(self._close)
+
+
+class LogStreamHub:
+    """Follower compartido + fan-out de líneas a todos los suscriptores."""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[Path, Set[Subscriber]] = defaultdict(set)
+        self._commands: "SimpleQueue[Tuple[str, Subscriber, Optional[int], int]]" = SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="log-stream-hub", daemon=True
+                )
+                self._thread.start()
+
+    def subscribe(
+        self,
+        path: Path,
+        loop: asyncio.AbstractEventLoop,
+        offset: Optional[int] = None,
+        backlog_lines: int = 80,
+    ) -> Subscriber:
+        """
+        Registra un cliente. Si 'offset' viene (reconexión) se reenvía lo
+        escrito desde ese offset; si no, las últimas 'backlog_lines' líneas.
+        """
+        sub = Subscriber(Path(os.path.abspath(path)), loop)
+        self._commands.put(("add", sub, offset, backlog_lines))
+        self._ensure_thread()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._commands.put(("remove", sub, None, 0))
+
+    def _backlog(
+        self, follower: LogFollower, sub: Subscriber, offset: Optional[int], lines: int
+    ) -> List[Tuple[int, str]]:
+        end = follower.offset(sub.path)
+        if offset is None or offset > end:
+            return read_lines(sub.path, tail_offset(sub.path, lines, end=end), end)
+        if end - offset > MAX_REPLAY_BYTES:
+            # Demasiado atrasado: mandamos sólo el final, descartando la
+            # primera línea que puede quedar cortada
+            return read_lines(sub.path, end - MAX_REPLAY_BYTES, end)[1:]
+        return read_lines(sub.path, offset, end)
+
+    def _handle_commands(self, follower: LogFollower) -> None:
+        while True:
+            try:
+                action, sub, offset, lines = self._commands.get_nowait()
+            except Empty:
+                return
+
+            if action == "add":
+                subs = self._subscribers[sub.path]
+                if not subs:
+                    try:
+                        follower.add(sub.path)
+                    except OSError:
+                        # Sólo se corta este cliente; el hub sigue atendiendo
+                        # al resto de los logs
+                        del self._subscribers[sub.path]
+                        sub.close()
+                        continue
+                subs.add(sub)
+                try:
+                    sub.push(self._backlog(follower, sub, offset, lines))
+                except OSError:
+                    sub.push([])
+            else:
+                subs = self._subscribers.get(sub.path)
+                if subs is None:
+                    continue
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.path]
+                    follower.remove(sub.path)
+
+    def _run(self) -> None:
+        with LogFollower() as follower:
+            while True:
+                self._handle_commands(follower)
+                by_path: Dict[Path, List[Tuple[int, str]]] = defaultdict(list)
+                for line in follower.poll(HUB_POLL_TIMEOUT):
+                    by_path[line.path].append((line.offset, line.text))
+                for path, items in by_path.items():
+                    for sub in list(self._subscribers.get(path, ())):
+                        sub.push(items)
+
+
+log_stream_hub = LogStreamHub()
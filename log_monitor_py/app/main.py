@@ -1,13 +1,27 @@
+import os
 from pathlib import Path
-from collections import Counter
-import re
-from typing import List, Dict, Any
+import sqlite3
+from typing import List
 
 from fastapi import FastAPI, Request, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from .dashboard_snapshot import dashboard_snapshot, process_rows
+from .log_aggregate import aggregate_logs, resolve_log_files
+from .log_family import parse_log_family, summarize_family_range, tail_family
+from .log_formats import get_format
+from .log_index import normalize_ts, query_time_range
+from .log_parser import parse_log_file_parallel, stats_cache
+from .log_search import search_log
+from .log_reader import tail_lines
+from .log_stream import SUBSCRIBER_QUEUE_SIZE, log_stream_hub
+from .metrics_sampler import metrics_sampler
+from .metrics_store import metrics_store, parse_time
+from .offload import run_blocking
+from .proc_snapshot import process_snapshot
+
 
 BASE_DIR = Path(__file__).resolve().parent
 LOGS_DIR = BASE_DIR / "logs"
@@ -22,48 +36,6 @@ app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
-LOG_PATTERN = re.compile(
-    r"^\[(?P<ts>.+?)\]\s+(?P<level>[A-Z]+)\s+(?P<msg>.*)$"
-)
-
-
-def parse_log_file(log_path: Path) -> Dict[str, Any]:
-    """
-    Parsea un archivo de log con líneas del estilo:
-    [2025-11-27 10:00:00] INFO Mensaje...
-
-    Devuelve métricas + últimas líneas parseadas.
-    """
-    if not log_path.exists():
-        raise FileNotFoundError(f"No existe el archivo: {log_path}")
-
-    with log_path.open("r", encoding="utf-8", errors="ignore") as f:
-        lines = [line.rstrip("\n") for line in f]
-
-    total_lines = len(lines)
-    level_counts: Counter[str] = Counter()
-    parsed_lines: List[Dict[str, str]] = []
-
-    for line in lines:
-        m = LOG_PATTERN.match(line.strip())
-        if not m:
-            # Línea que no matchea el patrón, la ignoramos en las métricas
-            continue
-
-        data = m.groupdict()
-        level = data["level"]
-        level_counts[level] += 1
-        parsed_lines.append(data)
-
-    recent = parsed_lines[-20:] if parsed_lines else []
-
-    return {
-        "total_lines": total_lines,
-        "level_counts": dict(level_counts),
-        "recent": recent,
-    }
-
-
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(
     request: Request,
@@ -84,7 +56,9 @@ async def dashboard(
     if log:
         log_path = LOGS_DIR / log
         try:
-            result = parse_log_file(log_path)
+            result = await run_blocking(
+                stats_cache.parse, log_path, key=("parse", str(log_path))
+            )
             stats = {
                 "total_lines": result["total_lines"],
                 "level_counts": result["level_counts"],
@@ -110,20 +84,197 @@ async def dashboard(
 @app.get("/api/logs", response_class=JSONResponse)
 async def api_logs(
     log: str = Query(..., description="Nombre del archivo de log en logs/"),
+    workers: int = Query(
+        default=0,
+        ge=0,
+        le=64,
+        description="Procesos para parsear en paralelo (0 = incremental con cache; "
+        "como máximo los núcleos disponibles)",
+    ),
+    since: str | None = Query(
+        default=None,
+        description="Desde (YYYY-MM-DD HH:MM:SS, ISO o relativo: 15m, 2h, 1d)",
+    ),
+    until: str | None = Query(default=None, description="Hasta (mismo formato que since)"),
+    rotated: bool = Query(
+        default=False,
+        description="Incluir los rotados (app.log.1, app.log.2.gz, ...) como un solo log",
+    ),
+    fmt: str | None = Query(
+        default=None,
+        alias="format",
+        description="Formato del log (bracket, json, logfmt, nginx); por defecto se detecta",
+    ),
 ):
     """
     Endpoint JSON para el mismo análisis de logs.
     Ej: /api/logs?log=example.log
+    Con ?workers=N el archivo se parsea completo en N procesos.
+    Con ?since=/?until= sólo se analiza esa ventana, usando el índice temporal.
+    Con ?rotated=true se suma toda la familia de rotados; con rango de
+    tiempo, el resumen sale de los histogramas por día/hora/minuto.
+    Los logs JSON, logfmt y nginx además traen "fields" (status y latencia).
+    """
+    log_path = LOGS_DIR / log
+    try:
+        log_format = get_format(fmt)
+        if rotated:
+            if since or until:
+                since, until = normalize_ts(since), normalize_ts(until)
+                return await run_blocking(
+                    summarize_family_range,
+                    log_path,
+                    since,
+                    until,
+                    log_format,
+                    key=("family_range", str(log_path), since, until, fmt),
+                )
+            return await run_blocking(
+                parse_log_family, log_path, log_format, key=("family", str(log_path), fmt)
+            )
+        if since or until:
+            return await run_blocking(
+                query_time_range,
+                log_path,
+                since,
+                until,
+                log_format,
+                key=("range", str(log_path), since, until, fmt),
+            )
+        if workers:
+            # Más procesos que núcleos sólo suma arranques y memoria
+            workers = min(workers, os.cpu_count() or 1)
+            return await run_blocking(
+                parse_log_file_parallel,
+                log_path,
+                workers,
+                log_format,
+                key=("parallel", str(log_path), workers, fmt),
+            )
+        return await run_blocking(
+            stats_cache.parse, log_path, log_format, key=("parse", str(log_path), fmt)
+        )
+    except FileNotFoundError:
+        return JSONResponse(
+            {"error": f"El archivo '{log}' no existe en logs/."},
+            status_code=404,
+        )
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    except Exception as exc:
+        return JSONResponse(
+            {"error": f"Error al procesar el archivo: {exc}"},
+            status_code=500,
+        )
+
+
+@app.get("/api/logs/aggregate", response_class=JSONResponse)
+async def api_logs_aggregate(
+    pattern: str | None = Query(default=None, description="Glob dentro de logs/, ej: *.log"),
+    files: List[str] = Query(default=[], description="Archivos de logs/ (se puede repetir)"),
+    mode: str = Query(default="thread", regex="^(thread|process)$"),
+    workers: int | None = Query(default=None, ge=1, le=64),
+):
+    """
+    Analiza varios logs en paralelo y devuelve conteos combinados, el
+    detalle por archivo y las últimas líneas de todos ordenadas por tiempo.
+    Ej: /api/logs/aggregate?pattern=*.log
+        /api/logs/aggregate?files=a.log&files=b.log
+    """
+    try:
+        paths = resolve_log_files(LOGS_DIR, pattern, files)
+        if not paths:
+            return JSONResponse(
+                {"error": "No hay archivos que coincidan en logs/."},
+                status_code=404,
+            )
+        return await run_blocking(
+            aggregate_logs,
+            paths,
+            mode,
+            workers,
+            LOGS_DIR,
+            key=("aggregate", tuple(map(str, paths)), mode, workers),
+        )
+    except FileNotFoundError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=404)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    except Exception as exc:
+        return JSONResponse(
+            {"error": f"Error al procesar los archivos: {exc}"},
+            status_code=500,
+        )
+
+
+@app.get("/api/logs/histogram", response_class=JSONResponse)
+async def api_logs_histogram(
+    log: str = Query(..., description="Nombre del archivo de log en logs/"),
+    resolution: str = Query(default="minute", regex="^(minute|hour|day)$"),
+    since: str | None = Query(default=None, description="Desde (igual que en /api/logs)"),
+    until: str | None = Query(default=None, description="Hasta (igual que en /api/logs)"),
+):
+    """
+    Conteo de eventos por nivel en buckets de minuto, hora o día.
+    Sale de tablas pre-agregadas que se mantienen al parsear el log.
+    Ej: /api/logs/histogram?log=example.log&resolution=hour&since=1d
+    """
+    log_path = LOGS_DIR / log
+    try:
+        since, until = normalize_ts(since), normalize_ts(until)
+        return await run_blocking(
+            stats_cache.histogram,
+            log_path,
+            resolution,
+            since,
+            until,
+            key=("histogram", str(log_path), resolution, since, until),
+        )
+    except FileNotFoundError:
+        return JSONResponse(
+            {"error": f"El archivo '{log}' no existe en logs/."},
+            status_code=404,
+        )
+    except Exception as exc:
+        return JSONResponse(
+            {"error": f"Error al procesar el archivo: {exc}"},
+            status_code=500,
+        )
+
+
+@app.get("/api/logs/search", response_class=JSONResponse)
+async def api_logs_search(
+    log: str = Query(..., description="Nombre del archivo de log en logs/"),
+    q: str = Query(..., description='Búsqueda, ej: timeout AND ERROR, "no se pudo", conex*'),
+    level: str | None = Query(default=None, description="Filtrar por nivel"),
+    since: str | None = Query(default=None, description="Desde (igual que en /api/logs)"),
+    until: str | None = Query(default=None, description="Hasta (igual que en /api/logs)"),
+    limit: int = Query(default=50, ge=1, le=500),
+    before: int | None = Query(default=None, description="Cursor: next_before de la página anterior"),
+):
+    """
+    Búsqueda full-text en los mensajes del log, del más nuevo al más viejo.
+    Ej: /api/logs/search?log=example.log&q=solicitud AND ERROR
     """
     log_path = LOGS_DIR / log
     try:
-        result = parse_log_file(log_path)
-        return result
+        return await run_blocking(
+            search_log,
+            log_path,
+            q,
+            level,
+            normalize_ts(since),
+            normalize_ts(until),
+            limit,
+            before,
+        )
     except FileNotFoundError:
         return JSONResponse(
             {"error": f"El archivo '{log}' no existe en logs/."},
             status_code=404,
         )
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
     except Exception as exc:
         return JSONResponse(
             {"error": f"Error al procesar el archivo: {exc}"},
@@ -147,9 +298,17 @@ if __name__ == "__main__":
 # Ruta: /dashboard
 # =========================
 
-from pathlib import Path
+import asyncio
+import re
+
 from fastapi import Request
 
+# Segundos sin líneas nuevas antes de mandar un keep-alive al cliente SSE
+STREAM_KEEPALIVE = 15.0
+# Separadores de línea que reconoce SSE dentro de un campo 'data:'
+SSE_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
 @app.get("/dashboard")
 async def dashboard_view(request: Request):
     """
@@ -161,85 +320,117 @@ async def dashboard_view(request: Request):
     )
 
 
+@app.on_event("startup")
+async def start_metrics_sampler():
+    metrics_sampler.start()
+
+
+@app.on_event("shutdown")
+async def stop_metrics_sampler():
+    metrics_sampler.stop()
+
+
 @app.get("/api/metrics/cpu")
 async def api_cpu_metrics():
     """
-    Devuelve % de uso de CPU y cantidad de núcleos.
+    Devuelve % de uso de CPU y cantidad de núcleos (última muestra del sampler).
     """
-    import psutil
-
+    sample = metrics_sampler.latest()
     return {
-        "percent": psutil.cpu_percent(interval=0.2),
-        "cores": psutil.cpu_count(logical=True),
+        "percent": sample["cpu_percent"],
+        "cores": sample["cores"],
+        "ts": sample["ts"],
     }
 
 
 @app.get("/api/metrics/memory")
 async def api_memory_metrics():
     """
-    Devuelve uso de RAM.
+    Devuelve uso de RAM (última muestra del sampler).
     """
-    import psutil
+    sample = metrics_sampler.latest()
+    return {
+        "percent": sample["mem_percent"],
+        "total": sample["mem_total"],
+        "used": sample["mem_used"],
+        "available": sample["mem_available"],
+        "ts": sample["ts"],
+    }
 
-    mem = psutil.virtual_memory()
+
+@app.get("/api/metrics/history")
+async def api_metrics_history(
+    seconds: float = Query(default=300, gt=0, le=86400),
+    after: float | None = Query(default=None, description="Sólo muestras posteriores a este ts"),
+):
+    """
+    Muestras de CPU/RAM/carga de los últimos 'seconds' segundos.
+    Para pedir sólo lo nuevo se pasa after=<ts de la última muestra recibida>.
+    """
     return {
-        "percent": mem.percent,
-        "total": mem.total,
-        "used": mem.used,
-        "available": mem.available,
+        "interval": metrics_sampler.interval,
+        "samples": metrics_sampler.history(seconds, after),
     }
 
 
+@app.get("/api/metrics/series")
+async def api_metrics_series(
+    since: str = Query(default="1h", description="Desde: relativo (1h, 7d), ISO o epoch"),
+    until: str | None = Query(default=None, description="Hasta (mismo formato)"),
+    resolution: str = Query(default="auto", regex="^(auto|raw|1m|1h)$"),
+):
+    """
+    Historial persistente de CPU/RAM/disco/carga (sobrevive reinicios).
+    Con resolution=auto elige raw, 1m o 1h según el rango.
+    Ej: /api/metrics/series?since=30d
+    """
+    try:
+        start, end = parse_time(since), parse_time(until)
+    except ValueError:
+        return JSONResponse(
+            {"error": "Formato de fecha inválido (usar 15m, 7d o YYYY-MM-DD HH:MM)"},
+            status_code=400,
+        )
+    try:
+        return await run_blocking(metrics_store.query, start, end, resolution)
+    except sqlite3.Error as exc:
+        return JSONResponse(
+            {"error": f"No se pudo leer el historial: {exc}"},
+            status_code=500,
+        )
+
+
 @app.get("/api/metrics/processes")
 async def api_process_metrics(limit: int = 8):
     """
-    Devuelve una lista de procesos con CPU y RAM.
+    Devuelve los procesos con más CPU (foto compartida, ver proc_snapshot).
     Marca 'suspicious' si consumen mucho.
     """
-    import psutil
+    top = await run_blocking(process_snapshot.top, limit, key=("processes", limit))
+    return {"processes": process_rows(top)}
 
-    procesos = []
-    for p in psutil.process_iter(
-        ["pid", "name", "cpu_percent", "memory_percent"]
-    ):
-        try:
-            info = p.info
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-        cpu = info.get("cpu_percent") or 0.0
-        mem = info.get("memory_percent") or 0.0
-        name = (info.get("name") or "").lower()
-
-        sospechoso = (
-            cpu >= 50
-            or mem >= 10
-            or any(bad in name for bad in ["miner", "crypt", "hack", "keylog"])
-        )
-
-        procesos.append(
-            {
-                "pid": info.get("pid"),
-                "name": info.get("name"),
-                "cpu_percent": round(cpu, 1),
-                "memory_percent": round(mem, 1),
-                "suspicious": sospechoso,
-            }
-        )
 
-    # Ordeno por CPU descendente y corto en 'limit'
-    procesos = sorted(
-        procesos, key=lambda p: p["cpu_percent"], reverse=True
-    )[:limit]
-
-    return {"processes": procesos}
+@app.get("/api/dashboard/snapshot")
+async def api_dashboard_snapshot(
+    request: Request, limit: int = Query(default=8, ge=1, le=50)
+):
+    """
+    CPU, RAM y procesos en una sola respuesta (el tail de logs va por SSE).
+    Devuelve ETag: con If-None-Match igual y sin cambios contesta 304.
+    """
+    etag, body = await run_blocking(dashboard_snapshot.get, limit, key=("dashboard", limit))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/log_tail")
-async def api_log_tail(filename: str, lines: int = 80):
+async def api_log_tail(filename: str, lines: int = 80, rotated: bool = False):
     """
     Devuelve las últimas 'lines' líneas del log indicado.
-    Usa la carpeta app/logs.
+    Usa la carpeta app/logs. Con rotated=true, si el log vivo no alcanza,
+    sigue con los rotados (también .gz/.zst).
     """
     logs_dir = Path(__file__).parent / "logs"
     log_path = logs_dir / filename
@@ -250,11 +441,73 @@ async def api_log_tail(filename: str, lines: int = 80):
         }
 
     try:
-        content = log_path.read_text(encoding="utf-8", errors="ignore")
+        tail = await run_blocking(
+            tail_family if rotated else tail_lines,
+            log_path,
+            lines,
+            key=("tail", str(log_path), lines, rotated),
+        )
     except Exception as e:
         return {"error": f"No se pudo leer el archivo: {e}"}
 
-    all_lines = content.splitlines()
-    tail = all_lines[-lines:] if len(all_lines) > lines else all_lines
-
     return {"lines": tail}
+
+
+@app.get("/api/log_stream")
+async def api_log_stream(
+    request: Request,
+    filename: str,
+    lines: int = Query(80, ge=0, le=SUBSCRIBER_QUEUE_SIZE),
+    offset: int | None = Query(
+        default=None,
+        description="Offset en bytes desde donde reanudar (alternativa a Last-Event-ID)",
+    ),
+):
+    """
+    Stream en vivo (server-sent events) de las líneas nuevas del log.
+    Cada evento lleva como id el offset en bytes al final de la línea, así
+    al reconectar el navegador reanuda desde ahí (header Last-Event-ID).
+    """
+    log_path = LOGS_DIR / filename
+    if not log_path.exists():
+        return JSONResponse(
+            {"error": f"El archivo '{filename}' no existe en la carpeta logs/."},
+            status_code=404,
+        )
+
+    last_event_id = request.headers.get("last-event-id")
+    if offset is None and last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+
+    sub = log_stream_hub.subscribe(
+        log_path, asyncio.get_running_loop(), offset=offset, backlog_lines=lines
+    )
+
+    async def events():
+        try:
+            while not sub.lagged:
+                try:
+                    line_offset, text = await asyncio.wait_for(
+                        sub.queue.get(), timeout=STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if sub.closed and line_offset < 0:
+                    break
+                # Un '\r' suelto también corta la línea en SSE: cada tramo
+                # va en su propio 'data:'
+                data = "\n".join(f"data: {part}" for part in SSE_LINE_BREAK.split(text))
+                yield f"id: {line_offset}\n{data}\n\n"
+            # Si el cliente se atrasó cortamos acá; el navegador reconecta
+            # solo y reanuda desde su último id recibido
+        finally:
+            log_stream_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,140 @@
+"""
+Muestreo de métricas de sistema en segundo plano.
+
+Un único thread toma una muestra de CPU, memoria y carga cada
+SAMPLE_INTERVAL segundos y la guarda en un buffer circular. Los endpoints
+de /api/metrics/* sólo leen del buffer: responder cuesta lo mismo con uno o
+con cien dashboards abiertos, y nunca se bloquea el event loop esperando a
+psutil.
+
+Si se le pasa un MetricsStore, cada muestra también se guarda en disco
+(historial de días/meses, ver metrics_store).
+"""
+
+from collections import deque
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from .metrics_store import MetricsStore, metrics_store
+
+# Segundos entre muestras
+SAMPLE_INTERVAL = float(os.environ.get("LOG_MONITOR_SAMPLE_INTERVAL", "1.0"))
+# Muestras retenidas (1 hora con el intervalo por defecto)
+HISTORY_SIZE = 3600
+
+
+def take_sample() -> Dict[str, Any]:
+    """Una muestra de CPU/RAM/disco/carga. No bloquea: el % de CPU es desde la muestra anterior."""
+    import psutil
+
+    mem = psutil.virtual_memory()
+    try:
+        load1, load5, load15 = os.getloadavg()
+    except (AttributeError, OSError):
+        load1 = load5 = load15 = None
+    return {
+        "ts": time.time(),
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "cores": psutil.cpu_count(logical=True),
+        "mem_percent": mem.percent,
+        "mem_total": mem.total,
+        "mem_used": mem.used,
+        "mem_available": mem.available,
+        "disk_percent": psutil.disk_usage("/").percent,
+        "load1": load1,
+        "load5": load5,
+        "load15": load15,
+    }
+
+
+class MetricsSampler:
+    """Thread de muestreo + buffer circular con las últimas muestras."""
+
+    def __init__(
+        self,
+        interval: float = SAMPLE_INTERVAL,
+        history_size: int = HISTORY_SIZE,
+        store: Optional[MetricsStore] = None,
+    ) -> None:
+        self.interval = interval
+        self.store = store
+        self._samples: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._samples_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="metrics-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        import psutil
+
+        # La primera llamada de cpu_percent(None) siempre da 0.0: se descarta
+        psutil.cpu_percent(interval=None)
+        self._stop.wait(min(self.interval, 0.2))
+        while not self._stop.is_set():
+            try:
+                sample = take_sample()
+                with self._samples_lock:
+                    self._samples.append(sample)
+                self._ready.set()
+                if self.store is not None:
+                    self.store.append(sample)
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def latest(self) -> Dict[str, Any]:
+        """
+        La última muestra. Si el sampler todavía no corre lo arranca y espera
+        la primera (unos 200 ms, sólo esa vez).
+        """
+        if not self._samples:
+            self.start()
+            self._ready.wait(timeout=2.0)
+        if not self._samples:
+            raise RuntimeError("Todavía no hay muestras de métricas")
+        return self._samples[-1]
+
+    def history(
+        self, seconds: Optional[float] = None, after: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Muestras de los últimos 'seconds' segundos, o posteriores a 'after'
+        (timestamp de la última muestra que ya tiene el cliente). De la más
+        vieja a la más nueva.
+        """
+        self.start()
+        cutoff = after
+        if seconds is not None:
+            since = time.time() - seconds
+            cutoff = since if cutoff is None else max(cutoff, since)
+
+        out: List[Dict[str, Any]] = []
+        # Se recorre desde el final: el costo depende de la ventana, no del buffer
+        with self._samples_lock:
+            for sample in reversed(self._samples):
+                if cutoff is not None and sample["ts"] <= cutoff:
+                    break
+                out.append(sample)
+        out.reverse()
+        return out
+
+
+metrics_sampler = MetricsSampler(store=metrics_store)
@@ -0,0 +1,190 @@
+"""
+Historial persistente de métricas de sistema (CPU, RAM, disco, carga).
+
+Cada muestra del sampler se guarda en SQLite en tres niveles:
+
+- raw: la muestra tal cual, por 24 horas.
+- 1m: promedio y máximo por minuto, por 30 días.
+- 1h: promedio y máximo por hora, por 2 años.
+
+Los agregados se actualizan en el momento (upsert de sumas y máximos), así
+que guardar una muestra cuesta lo mismo siempre, y la retención mantiene
+acotado el tamaño del archivo. Lo escribe la web y lo puede leer el CLI.
+"""
+
+from datetime import datetime
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .log_index import normalize_ts
+
+METRICS_DB = Path(
+    os.environ.get(
+        "LOG_MONITOR_METRICS_DB",
+        Path(__file__).resolve().parent / "data" / "metrics.db",
+    )
+)
+
+# Columnas guardadas: nombre -> clave en la muestra del sampler
+METRICS = {
+    "cpu": "cpu_percent",
+    "mem": "mem_percent",
+    "disk": "disk_percent",
+    "load1": "load1",
+}
+
+# nivel -> (segundos por bucket, segundos retenidos)
+TIERS: Dict[str, Tuple[int, int]] = {
+    "raw": (0, 24 * 3600),
+    "1m": (60, 30 * 86400),
+    "1h": (3600, 730 * 86400),
+}
+
+# Puntos máximos a devolver al elegir la resolución automáticamente
+MAX_POINTS = 1500
+# Cada cuántas muestras se aplica la retención
+PRUNE_EVERY = 300
+
+
+def _schema() -> str:
+    cols = ", ".join(f"{m} REAL" for m in METRICS)
+    agg = ", ".join(f"{m}_sum REAL, {m}_max REAL" for m in METRICS)
+    return (
+        f"CREATE TABLE IF NOT EXISTS metrics_raw (ts REAL PRIMARY KEY, {cols});\n"
+        f"CREATE TABLE IF NOT EXISTS metrics_1m (ts INTEGER PRIMARY KEY, n INTEGER, {agg});\n"
+        f"CREATE TABLE IF NOT EXISTS metrics_1h (ts INTEGER PRIMARY KEY, n INTEGER, {agg});\n"
+    )
+
+
+def _upsert_sql(tier: str) -> str:
+    names = ", ".join(f"{m}_sum, {m}_max" for m in METRICS)
+    marks = ", ".join("?, ?" for _ in METRICS)
+    updates = ", ".join(
+        f"{m}_sum = {m}_sum + excluded.{m}_sum, {m}_max = max({m}_max, excluded.{m}_max)"
+        for m in METRICS
+    )
+    return (
+        f"INSERT INTO metrics_{tier} (ts, n, {names}) VALUES (?, 1, {marks}) "
+        f"ON CONFLICT(ts) DO UPDATE SET n = n + 1, {updates}"
+    )
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """
+    Epoch de un límite de tiempo: relativo ("15m", "7d"), ISO
+    ("2025-11-27", "2025-11-27T10:00") o un epoch en segundos.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return datetime.fromisoformat(normalize_ts(value)).timestamp()
+
+
+class MetricsStore:
+    """Series de tiempo de métricas en SQLite, con downsampling y retención."""
+
+    def __init__(self, db_path: Path = METRICS_DB) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._appends = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_schema())
+            self._conn = conn
+        return self._conn
+
+    def append(self, sample: Dict[str, Any]) -> None:
+        """Guarda una muestra del sampler y actualiza los agregados."""
+        ts = sample["ts"]
+        values = [float(sample.get(key) or 0.0) for key in METRICS.values()]
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"INSERT OR IGNORE INTO metrics_raw VALUES (?, {', '.join('?' for _ in METRICS)})",
+                [ts, *values],
+            )
+            for tier, (step, _) in TIERS.items():
+                if step:
+                    bucket = int(ts) - int(ts) % step
+                    pairs = [v for value in values for v in (value, value)]
+                    self.conn.execute(_upsert_sql(tier), [bucket, *pairs])
+            self._appends += 1
+            if self._appends % PRUNE_EVERY == 0:
+                self._prune(ts)
+
+    def _prune(self, now: float) -> None:
+        for tier, (_, keep) in TIERS.items():
+            self.conn.execute(f"DELETE FROM metrics_{tier} WHERE ts < ?", (now - keep,))
+
+    def query(
+        self,
+        since: float,
+        until: Optional[float] = None,
+        resolution: str = "auto",
+    ) -> Dict[str, Any]:
+        """
+        Muestras entre 'since' y 'until' (epoch). Con resolution="auto" se
+        usa el nivel más fino que no pase de MAX_POINTS puntos (y que todavía
+        tenga datos de ese rango). En 1m/1h cada punto trae promedio y máximo.
+        """
+        if resolution == "auto":
+            resolution = self._pick_resolution(since, until)
+        if resolution not in TIERS:
+            raise ValueError(f"Resolución inválida: {resolution}")
+
+        if resolution == "raw":
+            cols = ", ".join(METRICS)
+        else:
+            cols = "n, " + ", ".join(f"{m}_sum / n, {m}_max" for m in METRICS)
+        sql = f"SELECT ts, {cols} FROM metrics_{resolution} WHERE ts >= ?"
+        params: List[Any] = [since if resolution == "raw" else since - since % TIERS[resolution][0]]
+        if until is not None:
+            sql += " AND ts <= ?"
+            params.append(until)
+        sql += " ORDER BY ts"
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        points: List[Dict[str, Any]] = []
+        for row in rows:
+            point: Dict[str, Any] = {"ts": row[0]}
+            if resolution == "raw":
+                point.update(zip(METRICS, row[1:]))
+            else:
+                point["n"] = row[1]
+                for i, m in enumerate(METRICS):
+                    point[m] = row[2 + 2 * i]
+                    point[f"{m}_max"] = row[3 + 2 * i]
+            points.append(point)
+        return {"resolution": resolution, "since": since, "until": until, "points": points}
+
+    def _pick_resolution(self, since: float, until: Optional[float]) -> str:
+        now = time.time()
+        span = (until or now) - since
+        for tier, (step, keep) in TIERS.items():
+            if since >= now - keep and span / max(step, 1) <= MAX_POINTS:
+                return tier
+        return "1h"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+metrics_store = MetricsStore()
@@ -0,0 +1,50 @@
+"""
+Ejecución del trabajo bloqueante (parseos, lecturas, SQLite) fuera del
+event loop.
+
+Los endpoints async no pueden llamar directo a funciones que leen archivos
+grandes: mientras dura la llamada, uvicorn no atiende a nadie más. Acá se
+mandan a un pool de threads acotado (LOG_MONITOR_MAX_PARSES, por defecto 4)
+y los pedidos idénticos que están en curso se unen en uno solo: si diez
+clientes piden el mismo log a la vez, se parsea una vez y todos reciben el
+mismo resultado.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Trabajos bloqueantes en paralelo como máximo
+MAX_PARSES = max(1, int(os.environ.get("LOG_MONITOR_MAX_PARSES", "4")))
+
+executor = ThreadPoolExecutor(max_workers=MAX_PARSES, thread_name_prefix="log-monitor")
+
+# (loop, clave) -> future del trabajo en curso
+_inflight: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+
+
+async def run_blocking(
+    fn: Callable[..., Any], *args: Any, key: Optional[Hashable] = None, **kwargs: Any
+) -> Any:
+    """
+    Corre fn(*args, **kwargs) en el pool y espera el resultado.
+
+    Con 'key' (ej. ("parse", ruta)), si ya hay un trabajo en curso con la
+    misma clave se espera ese en vez de lanzar otro. Sólo se unen pedidos
+    simultáneos: el resultado no se guarda después de terminar.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if key is None:
+        return await loop.run_in_executor(executor, call)
+
+    slot = (id(loop), key)
+    future = _inflight.get(slot)
+    if future is None:
+        future = loop.run_in_executor(executor, call)
+        _inflight[slot] = future
+        future.add_done_callback(lambda _: _inflight.pop(slot, None))
+    # shield: si un cliente se desconecta no se cancela el trabajo de los demás
+    return await asyncio.shield(future)
@@ -0,0 +1,174 @@
+"""
+Tabla de procesos compartida por /api/metrics/processes y el CLI.
+
+Leer /proc para miles de procesos en cada pedido es caro, así que se arma
+una foto que se reutiliza durante REFRESH_INTERVAL segundos. Se lee /proc a
+bajo nivel (os.scandir + os.read de stat/statm/cmdline) y se guarda estado
+por PID entre fotos: los ticks de CPU para calcular el % como delta, y el
+cmdline. Un exec() no cambia PID ni starttime, así que el cmdline se vuelve
+a leer cuando cambia el nombre (comm) o cada CMDLINE_MAX_AGE segundos.
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple
+
+PROC_ROOT = "/proc"
+# Segundos que se reutiliza una foto antes de volver a leer /proc
+REFRESH_INTERVAL = 2.0
+# Bytes de cmdline que se leen por proceso
+CMDLINE_MAX = 4096
+# Segundos que se reutiliza el cmdline de un proceso con el mismo nombre
+CMDLINE_MAX_AGE = 30.0
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class _PidState(NamedTuple):
+    starttime: int
+    ticks: int
+    name: str
+    cmd: str
+    cmd_read_at: float
+
+
+def _read(path: str, size: int = 4096) -> bytes:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+def _mem_total() -> int:
+    for line in _read(f"{PROC_ROOT}/meminfo").splitlines():
+        if line.startswith(b"MemTotal:"):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+class ProcessSnapshot:
+    """Foto cacheada de los procesos, con % de CPU desde la foto anterior."""
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL) -> None:
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._processes: List[Dict[str, Any]] = []
+        self._taken_at = 0.0
+        self._states: Dict[int, _PidState] = {}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Procesos de la última foto (se renueva si tiene más de refresh_interval)."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._taken_at or now - self._taken_at >= self.refresh_interval:
+                if os.path.isdir(PROC_ROOT):
+                    self._processes = self._scan_proc(now)
+                else:
+                    self._processes = self._scan_psutil()
+                self._taken_at = now
+            return self._processes
+
+    @property
+    def taken_at(self) -> float:
+        """Momento (time.monotonic) de la última foto; sirve como versión."""
+        return self._taken_at
+
+    def top(self, n: int, key: str = "cpu_percent") -> List[Dict[str, Any]]:
+        """Los n procesos con mayor 'key', sin ordenar toda la tabla."""
+        return heapq.nlargest(n, self.snapshot(), key=lambda p: p[key])
+
+    def _scan_proc(self, now: float) -> List[Dict[str, Any]]:
+        elapsed = now - self._taken_at if self._taken_at else 0.0
+        mem_total = _mem_total()
+        states: Dict[int, _PidState] = {}
+        processes: List[Dict[str, Any]] = []
+
+        with os.scandir(PROC_ROOT) as it:
+            for entry in it:
+                if not entry.name.isdigit():
+                    continue
+                pid = int(entry.name)
+                base = f"{PROC_ROOT}/{entry.name}"
+                try:
+                    stat = _read(f"{base}/stat")
+                    rss_pages = int(_read(f"{base}/statm").split()[1])
+                except (OSError, IndexError, ValueError):
+                    # El proceso terminó mientras se leía
+                    continue
+
+                # "pid (comm) estado ..." - comm puede tener espacios y ")"
+                close = stat.rfind(b")")
+                name = stat[stat.find(b"(") + 1 : close].decode("utf-8", errors="replace")
+                fields = stat[close + 2 :].split()
+                ticks = int(fields[11]) + int(fields[12])
+                starttime = int(fields[19])
+
+                previous = self._states.get(pid)
+                cpu = 0.0
+                if previous is not None and previous.starttime == starttime:
+                    if elapsed > 0:
+                        cpu = (ticks - previous.ticks) / _CLK_TCK / elapsed * 100.0
+                else:
+                    # PID nuevo (o reutilizado)
+                    previous = None
+                if (
+                    previous is not None
+                    and previous.name == name
+                    and now - previous.cmd_read_at < CMDLINE_MAX_AGE
+                ):
+                    cmd, cmd_read_at = previous.cmd, previous.cmd_read_at
+                else:
+                    try:
+                        raw = _read(f"{base}/cmdline", CMDLINE_MAX)
+                    except OSError:
+                        raw = b""
+                    cmd = raw.replace(b"\x00", b" ").decode("utf-8", errors="replace").strip()
+                    cmd = cmd or f"[{name}]"
+                    cmd_read_at = now
+                states[pid] = _PidState(starttime, ticks, name, cmd, cmd_read_at)
+
+                rss = rss_pages * _PAGE_SIZE
+                processes.append(
+                    {
+                        "pid": pid,
+                        "name": name,
+                        "cmd": cmd,
+                        "cpu_percent": round(cpu, 1),
+                        "memory_percent": round(rss / mem_total * 100.0, 1) if mem_total else 0.0,
+                        "rss": rss,
+                    }
+                )
+
+        # Los PIDs que ya no existen se descartan
+        self._states = states
+        return processes
+
+    def _scan_psutil(self) -> List[Dict[str, Any]]:
+        # Sin /proc (macOS, Windows): psutil guarda el estado por proceso
+        import psutil
+
+        processes: List[Dict[str, Any]] = []
+        for p in psutil.process_iter(
+            ["pid", "name", "cmdline", "cpu_percent", "memory_percent", "memory_info"]
+        ):
+            info = p.info
+            name = info.get("name") or ""
+            rss = info["memory_info"].rss if info.get("memory_info") else 0
+            processes.append(
+                {
+                    "pid": info["pid"],
+                    "name": name,
+                    "cmd": " ".join(info.get("cmdline") or []) or f"[{name}]",
+                    "cpu_percent": round(info.get("cpu_percent") or 0.0, 1),
+                    "memory_percent": round(info.get("memory_percent") or 0.0, 1),
+                    "rss": rss,
+                }
+            )
+        return processes
+
+
+process_snapshot = ProcessSnapshot()
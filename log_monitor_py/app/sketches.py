@@ -0,0 +1,233 @@
+"""
+Resúmenes aproximados ("sketches") para agregar campos de logs en una pasada.
+
+Con cientos de millones de líneas no entra en memoria la lista de todas las
+latencias ni el conteo exacto de cada endpoint o cliente. Estos resúmenes
+ocupan memoria acotada, se actualizan línea por línea y se pueden combinar
+(merge) entre archivos, rangos paralelos o buckets de tiempo:
+
+- TDigest: percentiles (p50/p95/p99) con error relativo chico en las colas.
+- SpaceSaving: los N valores más frecuentes (endpoints, mensajes).
+- HyperLogLog: cantidad aproximada de valores distintos (clientes).
+"""
+
+from bisect import bisect_left
+import hashlib
+import math
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+# Centroides del t-digest (más = más preciso y más memoria)
+TDIGEST_COMPRESSION = 200
+# Valores seguidos en SpaceSaving (el doble se guarda entre podas)
+SPACE_SAVING_CAPACITY = 100
+# 2^p registros en HyperLogLog: p=12 son 4 KB y ~1.6% de error
+HLL_PRECISION = 12
+# Valores distintos que HyperLogLog junta en un set antes de hashearlos
+HLL_PENDING = 4096
+
+
+class TDigest:
+    """t-digest "merging": centroides (media, peso) ordenados más un buffer."""
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION) -> None:
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self._buffer: List[float] = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        # Sólo se acumula: count/min/max se actualizan al comprimir
+        buffer = self._buffer
+        buffer.append(value)
+        if len(buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        # No toca 'other' (puede estar compartido en un cache)
+        self._compress()
+        self.means += other.means
+        self.weights += other.weights
+        self._buffer += other._buffer
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(force=True)
+
+    def _k_limit(self, q: float) -> float:
+        # Límite superior de q para un centroide que empieza en q
+        # (escala k1: centroides más chicos cerca de las colas)
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self, force: bool = False) -> None:
+        if not self._buffer and not force:
+            return
+        buffer = self._buffer
+        if buffer:
+            self.count += len(buffer)
+            self.min = min(self.min, min(buffer))
+            self.max = max(self.max, max(buffer))
+        items = sorted(list(zip(self.means, self.weights)) + [(v, 1.0) for v in buffer])
+        self._buffer = []
+        if not items:
+            return
+        total = sum(w for _, w in items)
+
+        means: List[float] = []
+        weights: List[float] = []
+        mean, weight = items[0]
+        so_far = 0.0
+        limit = self._k_limit(0.0) * total
+        for m, w in items[1:]:
+            if so_far + weight + w <= limit:
+                # Se suma al centroide actual (media ponderada)
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                so_far += weight
+                limit = self._k_limit(so_far / total) * total
+                mean, weight = m, w
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Valor aproximado del cuantil q (0..1); None si no hay datos."""
+        self._compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+
+        target = q * self.count
+        # Posición (peso acumulado) del centro de cada centroide
+        centers: List[float] = []
+        cum = 0.0
+        for w in self.weights:
+            centers.append(cum + w / 2)
+            cum += w
+
+        if target <= centers[0]:
+            if centers[0] == 0:
+                return self.min
+            return self.min + (self.means[0] - self.min) * target / centers[0]
+        if target >= centers[-1]:
+            span = cum - centers[-1]
+            if span == 0:
+                return self.max
+            return self.means[-1] + (self.max - self.means[-1]) * (target - centers[-1]) / span
+
+        i = bisect_left(centers, target)
+        left, right = centers[i - 1], centers[i]
+        frac = (target - left) / (right - left) if right > left else 0.0
+        return self.means[i - 1] + (self.means[i] - self.means[i - 1]) * frac
+
+
+class SpaceSaving:
+    """
+    Top-N aproximado. Guarda hasta 2*capacity contadores; al llenarse poda
+    la mitad menos frecuente y recuerda el máximo podado ('floor'): un valor
+    que aparece después arranca con ese conteo, así los conteos nunca
+    subestiman y el error de cada uno queda acotado por 'error'.
+    """
+
+    def __init__(self, capacity: int = SPACE_SAVING_CAPACITY) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.floor = 0
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        counts[item] = self.floor + count
+        self.errors[item] = self.floor
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        for item, count in ranked[self.capacity:]:
+            self.floor = max(self.floor, count)
+            del self.counts[item]
+            del self.errors[item]
+
+    def merge(self, other: "SpaceSaving") -> None:
+        counts: Dict[Hashable, int] = {}
+        errors: Dict[Hashable, int] = {}
+        for item in self.counts.keys() | other.counts.keys():
+            # Ausente en un lado: pudo haber aparecido hasta 'floor' veces ahí
+            counts[item] = self.counts.get(item, self.floor) + other.counts.get(item, other.floor)
+            errors[item] = self.errors.get(item, self.floor) + other.errors.get(item, other.floor)
+        self.counts, self.errors = counts, errors
+        self.floor += other.floor
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [
+            {"value": item, "count": count, "error": self.errors[item]}
+            for item, count in ranked
+        ]
+
+
+class HyperLogLog:
+    """
+    Conteo aproximado de distintos con 2^precision registros de 1 byte. Los
+    valores se juntan primero en un set chico, así los repetidos (el mismo
+    cliente en muchas líneas) se hashean una sola vez por tanda.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._pending: Set[str] = set()
+
+    def add(self, item: str) -> None:
+        pending = self._pending
+        pending.add(item)
+        if len(pending) >= HLL_PENDING:
+            self._flush()
+
+    def _flush(self) -> None:
+        bits = 64 - self.precision
+        mask = (1 << bits) - 1
+        registers = self.registers
+        for item in self._pending:
+            h = int.from_bytes(
+                hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            idx = h >> bits
+            rank = bits - (h & mask).bit_length() + 1
+            if rank > registers[idx]:
+                registers[idx] = rank
+        self._pending = set()
+
+    def merge(self, other: "HyperLogLog") -> None:
+        self._flush()
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self._pending = set(other._pending)
+        if len(self._pending) >= HLL_PENDING:
+            self._flush()
+
+    def estimate(self) -> int:
+        self._flush()
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        z = sum(2.0 ** -r for r in self.registers)
+        estimate = alpha * m * m / z
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Rango chico: conteo lineal
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Benchmarks del parser de logs.
+
+Genera logs sintéticos con el formato de la app y mide tiempo y memoria.
+Uso:
+    python bench.py memory --sizes 16 64 256
+    python bench.py parallel --size 2048 --workers 1 2 4 8
+    python bench.py fastpath --size 256
+    python bench.py formats --size 64
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from app.log_formats import FORMATS, _json_loads
+from app.log_parser import parse_log_file, parse_log_file_fast, parse_log_file_parallel
+
+LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "WARNING", "ERROR"]
+MESSAGES = [
+    "Usuario conectado desde 10.0.0.{n}",
+    "Respuesta lenta del servicio externo ({n} ms)",
+    "No se pudo procesar la solicitud {n}",
+    "Reintento de la solicitud {n}",
+    "Timeout consultando la base de datos (intento {n})",
+]
+
+
+def format_line(fmt: str, ts: str, level: str, msg: str, rnd: random.Random) -> str:
+    """Una línea sintética en el formato 'fmt' (ver app/log_formats.py)."""
+    if fmt == "bracket":
+        return f"[{ts}] {level} {msg}"
+    status = rnd.choice([200, 200, 200, 201, 304, 404, 500])
+    latency = rnd.expovariate(1 / 80.0)
+    path = rnd.choice(["/api/logs", "/api/metrics/cpu", "/dashboard", "/login"])
+    if fmt == "json":
+        return json.dumps(
+            {"time": ts.replace(" ", "T"), "level": level.lower(), "msg": msg,
+             "status": status, "duration_ms": round(latency, 2), "path": path}
+        )
+    if fmt == "logfmt":
+        return (f'time={ts.replace(" ", "T")} level={level.lower()} msg="{msg}" '
+                f"status={status} duration_ms={latency:.2f} path={path}")
+    if fmt == "nginx":
+        day, clock = ts[8:10], ts[11:]
+        return (f'10.0.{rnd.randint(0, 255)}.{rnd.randint(1, 254)} - - [{day}/Nov/2025:{clock} +0000] '
+                f'"GET {path}?id={rnd.randint(1, 9999)} HTTP/1.1" {status} {rnd.randint(200, 9000)} '
+                f'"-" "Mozilla/5.0" {latency / 1000:.3f}')
+    raise ValueError(f"Formato desconocido: {fmt}")
+
+
+def make_synthetic_log(path: Path, size_mb: int, seed: int = 42, fmt: str = "bracket") -> Path:
+    """Escribe un log sintético de ~size_mb MB en el formato 'fmt' (por defecto '[ts] LEVEL msg')."""
+    rnd = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    second = 0
+    with path.open("w", encoding="utf-8") as f:
+        while written < target:
+            chunk = []
+            for _ in range(1000):
+                second += 1
+                h, rem = divmod(second % 86400, 3600)
+                m, s = divmod(rem, 60)
+                day = 1 + (second // 86400) % 28
+                level = rnd.choice(LEVELS)
+                msg = rnd.choice(MESSAGES).format(n=rnd.randint(1, 9999))
+                ts = f"2025-11-{day:02d} {h:02d}:{m:02d}:{s:02d}"
+                chunk.append(format_line(fmt, ts, level, msg, rnd) + "\n")
+            data = "".join(chunk)
+            f.write(data)
+            written += len(data)
+    return path
+
+
+def measure(fn: Callable[[], object]) -> Tuple[float, int]:
+    """Devuelve (segundos, pico de memoria Python en bytes) de ejecutar fn."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_memory(sizes: List[int]) -> None:
+    print(f"{'tamaño':>8} {'tiempo':>9} {'pico mem':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = make_synthetic_log(Path(tmp) / f"synthetic_{size}.log", size)
+            elapsed, peak = measure(lambda: parse_log_file(path))
+            print(f"{size:>6}MB {elapsed:>8.2f}s {peak / 1024:>8.0f}KB")
+            path.unlink()
+
+
+def bench_parallel(size_mb: int, workers: List[int]) -> None:
+    print(f"log sintético de {size_mb}MB")
+    print(f"{'workers':>8} {'tiempo':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_synthetic_log(Path(tmp) / "synthetic.log", size_mb)
+        base = None
+        for n in workers:
+            t0 = time.perf_counter()
+            if n <= 1:
+                # Mismo escaneo con mmap que usa cada worker, en un solo proceso
+                parse_log_file_fast(path)
+            else:
+                parse_log_file_parallel(path, n)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f"{n:>8} {elapsed:>8.2f}s {base / elapsed:>7.2f}x")
+
+
+def bench_fastpath(size_mb: int, repeat: int) -> None:
+    print(f"log sintético de {size_mb}MB (mejor de {repeat})")
+    print(f"{'implementación':<22} {'tiempo':>9} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_synthetic_log(Path(tmp) / "synthetic.log", size_mb)
+        base = None
+        for name, fn in [
+            ("parse_log_file", parse_log_file),
+            ("parse_log_file_fast", parse_log_file_fast),
+        ]:
+            elapsed = min(measure_time(lambda: fn(path)) for _ in range(repeat))
+            base = base or elapsed
+            print(f"{name:<22} {elapsed:>8.2f}s {size_mb / elapsed:>8.1f}  ({base / elapsed:.1f}x)")
+
+
+def bench_formats(size_mb: int, repeat: int) -> None:
+    decoder = "orjson" if _json_loads is not json.loads else "json (stdlib)"
+    print(f"log sintético de {size_mb}MB por formato (mejor de {repeat}, decoder JSON: {decoder})")
+    print(f"{'formato':<10} {'tiempo':>9} {'MB/s':>8} {'líneas/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in FORMATS:
+            path = make_synthetic_log(Path(tmp) / f"synthetic_{name}.log", size_mb, fmt=name)
+            real_mb = path.stat().st_size / (1024 * 1024)
+            result = parse_log_file_fast(path)
+            elapsed = min(measure_time(lambda: parse_log_file_fast(path)) for _ in range(repeat))
+            rate = result["total_lines"] / elapsed
+            print(f"{name:<10} {elapsed:>8.2f}s {real_mb / elapsed:>8.1f} {rate:>12,.0f}")
+            path.unlink()
+
+
+def measure_time(fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks del Log Monitor")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_mem = sub.add_parser("memory", help="Pico de memoria de parse_log_file vs tamaño del log")
+    p_mem.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="Tamaños en MB")
+
+    p_par = sub.add_parser("parallel", help="Speedup de parse_log_file_parallel vs cantidad de procesos")
+    p_par.add_argument("--size", type=int, default=2048, help="Tamaño del log en MB (default 2048)")
+    p_par.add_argument(
+        "--workers", type=int, nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+        help="Cantidades de procesos a medir",
+    )
+
+    p_fast = sub.add_parser("fastpath", help="parse_log_file vs camino rápido con mmap + regex en bytes")
+    p_fast.add_argument("--size", type=int, default=256, help="Tamaño del log en MB (default 256)")
+    p_fast.add_argument("--repeat", type=int, default=3, help="Repeticiones por implementación")
+
+    p_fmt = sub.add_parser("formats", help="Throughput del parser por formato (bracket, json, logfmt, nginx)")
+    p_fmt.add_argument("--size", type=int, default=64, help="Tamaño del log en MB (default 64)")
+    p_fmt.add_argument("--repeat", type=int, default=3, help="Repeticiones por formato")
+
+    args = parser.parse_args()
+    if args.command == "memory":
+        bench_memory(args.sizes)
+    elif args.command == "parallel":
+        bench_parallel(args.size, args.workers)
+    elif args.command == "fastpath":
+        bench_fastpath(args.size, args.repeat)
+    elif args.command == "formats":
+        bench_formats(args.size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
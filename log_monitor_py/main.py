@@ -2,14 +2,25 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import os
 import sys
-import time
-from collections import deque
 from pathlib import Path
 import shutil
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+import urllib.request
+
+from app.log_family import parse_log_family, tail_family
+from app.log_follower import LogFollower
+from app.keyword_matcher import suspicious_keywords
+from app.log_index import normalize_ts
+from app.log_formats import FORMATS, get_format
+from app.log_parser import parse_log_file, parse_log_file_parallel
+from app.log_search import search_log
+from app.metrics_store import metrics_store, parse_time
+from app.log_reader import tail_lines
+from app.proc_snapshot import process_snapshot
 
 # --- Paths base del proyecto ---
 BASE_DIR = Path(__file__).resolve().parent
@@ -27,20 +38,6 @@ logging.basicConfig(
     ],
 )
 
-# Palabras clave muy simples para "procesos sospechosos" (demo)
-SUSPICIOUS_KEYWORDS = [
-    "nmap",
-    "hydra",
-    "sqlmap",
-    "john ",
-    "hashcat",
-    "nc ",
-    " netcat",
-    "aircrack",
-    "masscan",
-    "msfconsole",
-]
-
 
 def safe_log_path(log_name: str) -> Path:
     """Devuelve la ruta segura dentro de app/logs/."""
@@ -50,36 +47,41 @@ def safe_log_path(log_name: str) -> Path:
     return log_path
 
 
-def tail_log(log_name: str, lines: int = 20) -> List[str]:
-    """Devuelve las últimas N líneas de un log."""
-    path = safe_log_path(log_name)
-    if not path.exists():
-        raise FileNotFoundError(f"El archivo {path.name} no existe en app/logs/")
-
-    dq: deque[str] = deque(maxlen=lines)
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            dq.append(line.rstrip("\n"))
-    return list(dq)
-
-
-def watch_log(log_name: str) -> None:
-    """Tail -f sencillo: muestra nuevas líneas en tiempo real."""
+def tail_log(log_name: str, lines: int = 20, rotated: bool = False) -> List[str]:
+    """Devuelve las últimas N líneas de un log (opcionalmente, con sus rotados)."""
     path = safe_log_path(log_name)
     if not path.exists():
         raise FileNotFoundError(f"El archivo {path.name} no existe en app/logs/")
 
-    logging.info("Monitoreando %s (Ctrl+C para salir)", path.name)
-
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        # Ir al final del archivo
-        f.seek(0, os.SEEK_END)
-        while True:
-            line = f.readline()
-            if line:
-                print(line.rstrip("\n"))
+    if rotated:
+        return tail_family(path, lines)
+    return tail_lines(path, lines)
+
+
+def watch_log(*log_names: str) -> None:
+    """Tail -f de uno o más logs: muestra nuevas líneas en tiempo real."""
+    paths = []
+    for log_name in log_names:
+        path = safe_log_path(log_name)
+        if not path.exists():
+            raise FileNotFoundError(f"El archivo {path.name} no existe en app/logs/")
+        paths.append(path)
+
+    with LogFollower() as follower:
+        for path in paths:
+            follower.add(path)
+        modo = "inotify" if follower.uses_inotify else "polling"
+        logging.info(
+            "Monitoreando %s con %s (Ctrl+C para salir)",
+            ", ".join(p.name for p in paths),
+            modo,
+        )
+
+        for line in follower.follow():
+            if len(paths) > 1:
+                print(f"[{line.path.name}] {line.text}")
             else:
-                time.sleep(1)
+                print(line.text)
 
 
 def get_system_metrics() -> Dict[str, Any]:
@@ -123,35 +125,38 @@ def get_system_metrics() -> Dict[str, Any]:
     }
 
 
+def fetch_metrics_history(server: str, seconds: float) -> Optional[List[Dict[str, Any]]]:
+    """
+    Pide al server web el historial del sampler (/api/metrics/history).
+    Devuelve None si no responde.
+    """
+    url = f"{server.rstrip('/')}/api/metrics/history?seconds={seconds:g}"
+    try:
+        with urllib.request.urlopen(url, timeout=3) as resp:
+            return json.load(resp)["samples"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def print_metrics_history(samples: List[Dict[str, Any]], seconds: float) -> None:
+    last = samples[-1]
+    cpu = [s["cpu_percent"] for s in samples]
+    mem = [s["mem_percent"] for s in samples]
+    print(f"=== Métricas de sistema (últimos {seconds:g}s, {len(samples)} muestras) ===")
+    print(f"CPU: actual {last['cpu_percent']:.1f}%  prom {sum(cpu) / len(cpu):.1f}%  máx {max(cpu):.1f}%")
+    print(f"Memoria: actual {last['mem_percent']:.1f}%  prom {sum(mem) / len(mem):.1f}%  máx {max(mem):.1f}%")
+    if last["load1"] is not None:
+        print(f"Carga promedio (1m,5m,15m): {last['load1']:.2f}, {last['load5']:.2f}, {last['load15']:.2f}")
+
+
 def scan_processes() -> List[Dict[str, Any]]:
-    """Busca procesos cuyo comando contenga alguna keyword de la lista."""
+    """Busca procesos cuyo comando contenga alguna keyword de app/rules/suspicious_keywords.txt."""
     results: List[Dict[str, Any]] = []
-    proc_root = Path("/proc")
-    if not proc_root.exists():
-        return results
-
-    for entry in proc_root.iterdir():
-        if not entry.is_dir() or not entry.name.isdigit():
-            continue
-        pid = int(entry.name)
-        cmd = ""
-        try:
-            cmdline_path = entry / "cmdline"
-            if cmdline_path.exists():
-                cmdline = cmdline_path.read_text(encoding="utf-8", errors="ignore")
-                cmd = cmdline.replace("\x00", " ").strip()
-            else:
-                comm_path = entry / "comm"
-                if comm_path.exists():
-                    cmd = comm_path.read_text(encoding="utf-8", errors="ignore").strip()
-        except Exception:
-            continue
-
-        low = cmd.lower()
-        for kw in SUSPICIOUS_KEYWORDS:
-            if kw in low:
-                results.append({"pid": pid, "cmd": cmd, "keyword": kw})
-                break
+    matcher = suspicious_keywords.matcher()
+    for proc in process_snapshot.snapshot():
+        kw = matcher.first(proc["cmd"].lower())
+        if kw:
+            results.append({"pid": proc["pid"], "cmd": proc["cmd"], "keyword": kw})
     return results
 
 
@@ -159,7 +164,41 @@ def scan_processes() -> List[Dict[str, Any]]:
 #   COMANDOS DEL CLI
 # ======================
 
+def print_metrics_series(since: str, resolution: str) -> bool:
+    """Resumen del historial guardado por la web (app/data/metrics.db)."""
+    if not metrics_store.db_path.exists():
+        return False
+    series = metrics_store.query(parse_time(since), resolution=resolution)
+    points = series["points"]
+    if not points:
+        return False
+    print(f"=== Historial de métricas (desde {since}, {len(points)} puntos {series['resolution']}) ===")
+    for label, key in (("CPU", "cpu"), ("Memoria", "mem"), ("Disco /", "disk")):
+        avg = sum(p[key] for p in points) / len(points)
+        peak = max(p.get(f"{key}_max", p[key]) for p in points)
+        print(f"{label}: prom {avg:.1f}%  máx {peak:.1f}%")
+    return True
+
+
 def cmd_metrics(args: argparse.Namespace) -> None:
+    if args.since:
+        try:
+            found = print_metrics_series(args.since, args.resolution)
+        except ValueError:
+            print("Formato de --since inválido (usar 1h, 7d o YYYY-MM-DD HH:MM).")
+            return
+        if found:
+            logging.info("Comando metrics ejecutado (historial desde %s)", args.since)
+            return
+        print("[!] No hay historial guardado para ese rango; muestra local.\n")
+    elif args.server:
+        samples = fetch_metrics_history(args.server, args.history)
+        if samples:
+            print_metrics_history(samples, args.history)
+            logging.info("Comando metrics ejecutado (historial de %s)", args.server)
+            return
+        print(f"[!] Sin historial en {args.server}; muestra local.\n")
+
     m = get_system_metrics()
     print("=== Métricas de sistema ===")
     if m["load1"] is not None:
@@ -192,19 +231,84 @@ def cmd_processes(args: argparse.Namespace) -> None:
 
 
 def cmd_tail(args: argparse.Namespace) -> None:
-    lines = tail_log(args.log, args.lines)
+    lines = tail_log(args.log, args.lines, args.rotated)
     print(f"=== Últimas {len(lines)} líneas de {args.log} ===")
     for line in lines:
         print(line)
     logging.info("Comando tail ejecutado sobre %s", args.log)
 
 
+def cmd_stats(args: argparse.Namespace) -> None:
+    path = safe_log_path(args.log)
+    if not path.exists():
+        raise FileNotFoundError(f"El archivo {path.name} no existe en app/logs/")
+
+    if args.rotated:
+        result = parse_log_family(path)
+    elif args.format:
+        result = parse_log_file(path, get_format(args.format))
+    else:
+        result = parse_log_file_parallel(path, args.workers)
+    print(f"=== Estadísticas de {args.log} ===")
+    if args.rotated:
+        print(f"Segmentos: {', '.join(result['segments'])}")
+    print(f"Total de líneas: {result['total_lines']}")
+    for level, count in sorted(result["level_counts"].items(), key=lambda kv: -kv[1]):
+        print(f"  {level:<10} {count}")
+    fields = result.get("fields", {})
+    if fields.get("status"):
+        print("Status HTTP:")
+        for status, count in sorted(fields["status"].items()):
+            print(f"  {status:<10} {count}")
+    if fields.get("latency_ms"):
+        lat = fields["latency_ms"]
+        print(f"Latencia: prom {lat['avg']:.1f} ms  máx {lat['max']:.1f} ms ({lat['count']} requests)")
+        if "p50" in lat:
+            print(f"  p50 {lat['p50']:.1f} ms  p95 {lat['p95']:.1f} ms  p99 {lat['p99']:.1f} ms")
+    if fields.get("top_paths"):
+        print("Endpoints más pedidos (aprox.):")
+        for item in fields["top_paths"]:
+            print(f"  {item['count']:>10}  {item['value']}")
+    if "distinct_clients" in fields:
+        print(f"Clientes distintos (aprox.): {fields['distinct_clients']}")
+    logging.info("Comando stats ejecutado sobre %s", args.log)
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    path = safe_log_path(args.log)
+    if not path.exists():
+        raise FileNotFoundError(f"El archivo {path.name} no existe en app/logs/")
+
+    try:
+        result = search_log(
+            path,
+            args.query,
+            level=args.level,
+            since=normalize_ts(args.since),
+            until=normalize_ts(args.until),
+            limit=args.limit,
+            before=args.before,
+            wait=None,
+        )
+    except ValueError as exc:
+        print(exc)
+        return
+    print(f"=== Resultados para '{args.query}' en {args.log} ===")
+    if not result["hits"]:
+        print("Sin resultados.")
+    for hit in result["hits"]:
+        print(f"[{hit['ts'] or '-'}] {hit['level'] or '-'} {hit['msg']}")
+    if result["next_before"] is not None:
+        print(f"(más resultados: --before {result['next_before']})")
+    logging.info("Comando search ejecutado sobre %s", args.log)
+
+
 def cmd_watch(args: argparse.Namespace) -> None:
     try:
-        watch_log(args.log)
+        watch_log(*args.logs)
     except KeyboardInterrupt:
         print("\n[Saliendo del watch]")
-    logging.info("Comando watch ejecutado sobre %s", args.log)
+    logging.info("Comando watch ejecutado sobre %s", ", ".join(args.logs))
 
 
 def cmd_web(args: argparse.Namespace) -> None:
@@ -226,14 +330,60 @@ def main() -> None:
     p_tail.add_argument(
         "-n", "--lines", type=int, default=20, help="Cantidad de líneas (default 20)"
     )
+    p_tail.add_argument(
+        "--rotated", action="store_true", help="Seguir en los rotados (.1, .2.gz, ...) si hace falta"
+    )
     p_tail.set_defaults(func=cmd_tail)
 
-    p_watch = sub.add_parser("watch", help="Seguir un log en tiempo real (tail -f)")
-    p_watch.add_argument("log", help="Nombre de archivo dentro de app/logs/")
+    p_stats = sub.add_parser("stats", help="Contar eventos por nivel de un log")
+    p_stats.add_argument("log", help="Nombre de archivo dentro de app/logs/")
+    p_stats.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Procesos en paralelo (default: cantidad de CPUs)",
+    )
+    p_stats.add_argument(
+        "--rotated", action="store_true", help="Incluir los rotados (.1, .2.gz, ...) como un solo log"
+    )
+    p_stats.add_argument(
+        "--format",
+        choices=list(FORMATS),
+        help="Formato del log (por defecto se detecta solo)",
+    )
+    p_stats.set_defaults(func=cmd_stats)
+
+    p_search = sub.add_parser("search", help="Buscar texto en un log (índice full-text)")
+    p_search.add_argument("log", help="Nombre de archivo dentro de app/logs/")
+    p_search.add_argument("query", help='Búsqueda, ej: "timeout AND ERROR"')
+    p_search.add_argument("--level", help="Filtrar por nivel (ej: ERROR)")
+    p_search.add_argument("--since", help="Desde (YYYY-MM-DD HH:MM:SS o relativo: 15m, 2h, 1d)")
+    p_search.add_argument("--until", help="Hasta (mismo formato que --since)")
+    p_search.add_argument("--limit", type=int, default=50, help="Resultados por página (default 50)")
+    p_search.add_argument("--before", type=int, help="Cursor de paginación (offset)")
+    p_search.set_defaults(func=cmd_search)
+
+    p_watch = sub.add_parser("watch", help="Seguir uno o más logs en tiempo real (tail -f)")
+    p_watch.add_argument("logs", nargs="+", help="Nombres de archivo dentro de app/logs/")
     p_watch.set_defaults(func=cmd_watch)
 
     # métricas de sistema
     p_metrics = sub.add_parser("metrics", help="Ver uso de CPU/RAM y disco")
+    p_metrics.add_argument(
+        "--server",
+        default=os.environ.get("LOG_MONITOR_URL"),
+        help="URL del server web para leer el historial del sampler (ej: http://127.0.0.1:8082)",
+    )
+    p_metrics.add_argument(
+        "--history", type=float, default=300, help="Segundos de historial (default 300)"
+    )
+    p_metrics.add_argument(
+        "--since", help="Leer el historial guardado desde (relativo: 1h, 7d, 30d, o ISO)"
+    )
+    p_metrics.add_argument(
+        "--resolution",
+        choices=["auto", "raw", "1m", "1h"],
+        default="auto",
+        help="Resolución del historial (default auto)",
+    )
     p_metrics.set_defaults(func=cmd_metrics)
 
     # procesos sospechosos
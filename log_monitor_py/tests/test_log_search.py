@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from app.log_search import search_log
+
+
+def write_log(path: Path, lines, mode: str = "w") -> None:
+    with path.open(mode, encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+
+
+def test_search_finds_lines(tmp_path):
+    log = tmp_path / "app.log"
+    write_log(log, [
+        "[2025-11-27 10:00:00] INFO Sistema iniciado",
+        "[2025-11-27 10:00:05] ERROR timeout en la base de datos",
+    ])
+
+    result = search_log(log, "timeout AND ERROR", wait=None)
+
+    assert [hit["msg"] for hit in result["hits"]] == ["timeout en la base de datos"]
+    assert result["indexing"] is False
+
+
+def test_search_after_truncate(tmp_path):
+    log = tmp_path / "app.log"
+    write_log(log, [f"[2025-11-27 10:00:{i:02d}] ERROR viejo {i}" for i in range(50)])
+    assert len(search_log(log, "viejo", wait=None)["hits"]) == 50
+
+    # Truncado (como copytruncate de logrotate) y vuelve a escribir
+    write_log(log, ["[2025-11-27 11:00:00] WARNING nuevo"])
+
+    result = search_log(log, "nuevo OR viejo", wait=None)
+    assert [hit["msg"] for hit in result["hits"]] == ["nuevo"]
+    assert search_log(log, "viejo", wait=None)["hits"] == []
+
+
+def test_search_after_rotation(tmp_path):
+    log = tmp_path / "app.log"
+    write_log(log, ["[2025-11-27 10:00:00] INFO antes de rotar"])
+    assert len(search_log(log, "rotar", wait=None)["hits"]) == 1
+
+    log.rename(tmp_path / "app.log.1")
+    write_log(log, ["[2025-11-27 12:00:00] INFO después de rotar y algo más largo"])
+
+    result = search_log(log, "rotar", wait=None)
+    assert [hit["msg"] for hit in result["hits"]] == ["después de rotar y algo más largo"]
+
+
+def test_search_json_log(tmp_path):
+    log = tmp_path / "app.log"
+    write_log(log, [
+        '{"time": "2025-11-27T10:00:00Z", "level": "info", "msg": "solicitud atendida"}',
+        '{"time": "2025-11-27T10:00:05Z", "level": "error", "msg": "solicitud fallida"}',
+    ])
+
+    result = search_log(log, "solicitud", level="INFO", wait=None)
+
+    assert result["hits"] == [
+        {"offset": 0, "ts": "2025-11-27 10:00:00", "level": "INFO", "msg": "solicitud atendida"}
+    ]
@@ -8,22 +8,36 @@ A lightweight CLI tool that checks a site's basic hardening posture:
 - Cookie flags (best-effort)
 - Info-leak headers (Server, X-Powered-By)
 - Additional checks (TLS version, HTTP→HTTPS redirect)
-Outputs a JSON report + a shareable HTML report.
+Every audit is saved to a report store (reports/audits.db) that answers trend
+queries and renders the shareable HTML report on demand; fleet mode also
+streams results as JSON lines.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
 import json
 import socket
 import ssl
-from dataclasses import dataclass
+import sys
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import IO, Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from audit_cache import DEFAULT_CACHE_PATH, DEFAULT_RESPONSE_MAX_AGE, DEFAULT_TLS_TTL, AuditCache
+from report_store import DEFAULT_STORE_PATH, ReportStore
 
 
 SECURITY_HEADERS = [
@@ -37,12 +51,31 @@ SECURITY_HEADERS = [
 
 INFO_LEAK_HEADERS = ["Server", "X-Powered-By"]
 
+USER_AGENT = "WebHardeningAuditor/1.0"
+# Only headers are audited: bodies up to this size are drained so the
+# connection goes back to the pool, larger ones are dropped unread
+DRAIN_LIMIT = 64 * 1024
+
+# Fleet mode defaults: audits in flight overall / against the same host
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 1
+# Targets read ahead and parked for busy hosts, as a multiple of concurrency
+MAX_WAITING = 4
+
 
 @dataclass
 class HttpsInfo:
     issuer: Optional[Dict[str, str]]
     expires: Optional[str]
     tls_version: Optional[str]
+    cipher: Optional[str] = None
+    subject: Optional[Dict[str, str]] = None
+    not_before: Optional[str] = None
+    sans: List[str] = field(default_factory=list)
+    # Verified chain, leaf first (None when the Python/ssl build cannot expose it)
+    chain: Optional[List[Dict[str, Any]]] = None
+    # "connection" when read from the main fetch, "handshake" for the separate probe
+    source: str = "handshake"
 
 
 def utc_now_iso() -> str:
@@ -67,6 +100,75 @@ def build_url(parsed, scheme: str) -> str:
     return urlunparse(parsed._replace(scheme=scheme))
 
 
+def _rdn(name) -> Optional[Dict[str, str]]:
+    return dict(x[0] for x in name) if name else None
+
+
+def _cert_summary(cert: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "subject": _rdn(cert.get("subject")),
+        "issuer": _rdn(cert.get("issuer")),
+        "not_before": cert.get("notBefore"),
+        "not_after": cert.get("notAfter"),
+    }
+
+
+def _verified_chain(tls) -> Optional[List[Dict[str, Any]]]:
+    """
+    Certificate chain as validated by the handshake. Public in Python 3.13+
+    (get_verified_chain); older versions only expose it on the internal _sslobj.
+    """
+    getter = getattr(tls, "get_verified_chain", None) or getattr(
+        getattr(tls, "_sslobj", None), "get_verified_chain", None
+    )
+    if getter is None:
+        return None
+    try:
+        return [_cert_summary(c.get_info()) for c in getter()]
+    except Exception:
+        return None
+
+
+def _https_info(tls, source: str = "handshake") -> HttpsInfo:
+    """HttpsInfo from a connected ssl.SSLSocket or asyncio's ssl.SSLObject."""
+    cert = tls.getpeercert() or {}
+    cipher = tls.cipher()
+    return HttpsInfo(
+        issuer=_rdn(cert.get("issuer")),
+        expires=cert.get("notAfter"),
+        tls_version=tls.version(),
+        cipher=cipher[0] if cipher else None,
+        subject=_rdn(cert.get("subject")),
+        not_before=cert.get("notBefore"),
+        sans=[value for _, value in cert.get("subjectAltName", ())],
+        chain=_verified_chain(tls),
+        source=source,
+    )
+
+
+class TlsCapture:
+    """
+    requests response hook that reads the TLS session of the first HTTPS
+    response served by `host`, while its connection is still attached (hooks
+    run before the body is read). This saves a second handshake per audit.
+    """
+
+    def __init__(self, host: Optional[str]) -> None:
+        self.host = host
+        self.info: Optional[HttpsInfo] = None
+
+    def __call__(self, r: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        if self.info is None and urlparse(r.url).hostname == self.host:
+            conn = getattr(r.raw, "_connection", None) or getattr(r.raw, "connection", None)
+            sock = getattr(conn, "sock", None)
+            if hasattr(sock, "getpeercert"):
+                try:
+                    self.info = _https_info(sock, source="connection")
+                except Exception:
+                    pass
+        return r
+
+
 def get_tls_and_cert(host: str, port: int = 443, timeout: int = 7) -> HttpsInfo:
     """
     Fetches TLS protocol version and basic certificate metadata via a direct TLS handshake.
@@ -75,12 +177,36 @@ def get_tls_and_cert(host: str, port: int = 443, timeout: int = 7) -> HttpsInfo:
     ctx = ssl.create_default_context()
     with socket.create_connection((host, port), timeout=timeout) as sock:
         with ctx.wrap_socket(sock, server_hostname=host) as ssock:
-            tls_version = ssock.version()
-            cert = ssock.getpeercert() or {}
-            issuer_list = cert.get("issuer")
-            issuer = dict(x[0] for x in issuer_list) if issuer_list else None
-            expires = cert.get("notAfter")
-            return HttpsInfo(issuer=issuer, expires=expires, tls_version=tls_version)
+            return _https_info(ssock)
+
+
+def _redirects_to_https(r: requests.Response, https_url: str) -> bool:
+    if not r.history:
+        return False
+    final = r.url or ""
+    final_parsed = urlparse(final)
+    if final_parsed.scheme == "https":
+        return True
+    # Some sites redirect http->https and then back via meta/js; keep it simple.
+    return final.startswith(https_url) or final_parsed.scheme == "https"
+
+
+def fetch_headers(get, url: str, timeout: int, **kwargs: Any) -> requests.Response:
+    """
+    GET `url` (following redirects) but stop once the headers are in: the body
+    is streamed, and only drained when it is small enough to keep the
+    connection reusable. `get` is requests.get or a Session's get.
+    """
+    resp = get(url, timeout=timeout, allow_redirects=True, stream=True, **kwargs)
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) <= DRAIN_LIMIT:
+        try:
+            resp.content
+        except Exception:
+            pass
+    # With the body consumed this returns the connection to the pool, otherwise closes it
+    resp.close()
+    return resp
 
 
 def http_to_https_redirect_check(parsed, timeout: int = 10) -> Optional[bool]:
@@ -92,19 +218,9 @@ def http_to_https_redirect_check(parsed, timeout: int = 10) -> Optional[bool]:
     if not host:
         return None
 
-    http_url = build_url(parsed, "http")
-    https_url = build_url(parsed, "https")
-
     try:
-        r = requests.get(http_url, timeout=timeout, allow_redirects=True, headers={"User-Agent": "WebHardeningAuditor/1.0"})
-        if not r.history:
-            return False
-        final = r.url or ""
-        final_parsed = urlparse(final)
-        if final_parsed.scheme == "https":
-            return True
-        # Some sites redirect http->https and then back via meta/js; keep it simple.
-        return final.startswith(https_url) or final_parsed.scheme == "https"
+        r = fetch_headers(requests.get, build_url(parsed, "http"), timeout, headers={"User-Agent": USER_AGENT})
+        return _redirects_to_https(r, build_url(parsed, "https"))
     except Exception:
         return None
 
@@ -114,8 +230,13 @@ def extract_cookie_flags(resp: requests.Response) -> list:
     Extracts cookie flag hints from Set-Cookie headers.
     Requests' cookie jar doesn't reliably expose HttpOnly/SameSite, so we parse raw headers best-effort.
     """
+    return cookie_flags_from_headers(resp.headers)
+
+
+def cookie_flags_from_headers(headers) -> list:
+    """extract_cookie_flags for a bare (case-insensitive) header mapping, e.g. cached headers."""
     cookies_out = []
-    raw = resp.headers.get("Set-Cookie")
+    raw = headers.get("Set-Cookie")
     if not raw:
         return cookies_out
 
@@ -142,11 +263,8 @@ def extract_cookie_flags(resp: requests.Response) -> list:
     return cookies_out
 
 
-def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
-    target = normalize_target(url)
-    parsed = urlparse(target)
-
-    result: Dict[str, Any] = {
+def _new_result(target: str) -> Dict[str, Any]:
+    return {
         "url": target,
         "timestamp": utc_now_iso(),
         "headers": {},
@@ -158,21 +276,15 @@ def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
         "recommendations": [],
     }
 
-    # Request (best-effort)
-    try:
-        resp = requests.get(
-            target,
-            timeout=timeout,
-            allow_redirects=True,
-            headers={"User-Agent": "WebHardeningAuditor/1.0"},
-        )
-    except Exception as e:
-        result["score"] = 0
-        result["recommendations"].append(f"Request failed: {type(e).__name__}")
-        return result
 
-    headers = resp.headers
+def _score_request_failure(result: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+    result["score"] = 0
+    result["recommendations"].append(f"Request failed: {type(error).__name__}")
+    return result
+
 
+def _score_response(result: Dict[str, Any], headers, parsed) -> None:
+    """`headers` is the final response's case-insensitive header mapping."""
     # Security headers
     for h in SECURITY_HEADERS:
         if h in headers:
@@ -190,7 +302,7 @@ def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
             result["recommendations"].append(f"Information leak header exposed: {h}")
 
     # Cookies (best-effort)
-    cookies = extract_cookie_flags(resp)
+    cookies = cookie_flags_from_headers(headers)
     result["cookies"] = cookies
     for c in cookies:
         name = c.get("name", "cookie")
@@ -202,26 +314,30 @@ def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
             result["score"] -= 3
             result["recommendations"].append(f"Cookie not marked HttpOnly: {name}")
 
-    # HTTPS / TLS
+
+def _score_tls(result: Dict[str, Any], parsed, info: Optional[HttpsInfo]) -> None:
+    """info is None when the TLS probe failed (or was not run for a host-less URL)."""
     if parsed.scheme != "https":
         result["score"] -= 20
         result["recommendations"].append("Site is not using HTTPS")
-    else:
-        host = parsed.hostname
-        if host:
-            try:
-                info = get_tls_and_cert(host)
-                result["https"] = {
-                    "issuer": info.issuer,
-                    "expires": info.expires,
-                }
-                result["checks"]["tls_version"] = info.tls_version
-            except Exception:
-                result["score"] -= 10
-                result["recommendations"].append("Could not read TLS/certificate metadata")
+    elif info is not None:
+        result["https"] = {
+            "issuer": info.issuer,
+            "expires": info.expires,
+            "subject": info.subject,
+            "not_before": info.not_before,
+            "sans": info.sans,
+            "chain": info.chain,
+            "source": info.source,
+        }
+        result["checks"]["tls_version"] = info.tls_version
+        result["checks"]["tls_cipher"] = info.cipher
+    elif parsed.hostname:
+        result["score"] -= 10
+        result["recommendations"].append("Could not read TLS/certificate metadata")
 
-    # HTTP -> HTTPS redirect
-    redirect_ok = http_to_https_redirect_check(parsed)
+
+def _score_redirect(result: Dict[str, Any], redirect_ok: Optional[bool]) -> Dict[str, Any]:
     result["checks"]["http_to_https_redirect"] = redirect_ok
     if redirect_ok is False:
         result["score"] -= 10
@@ -231,7 +347,187 @@ def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
     return result
 
 
+def audit(url: str, timeout: int = 10) -> Dict[str, Any]:
+    target = normalize_target(url)
+    parsed = urlparse(target)
+    result = _new_result(target)
+
+    # Request (best-effort); TLS metadata is read off this same connection
+    capture = TlsCapture(parsed.hostname)
+    try:
+        resp = fetch_headers(
+            requests.get,
+            target,
+            timeout,
+            headers={"User-Agent": USER_AGENT},
+            hooks={"response": capture},
+        )
+    except Exception as e:
+        return _score_request_failure(result, e)
+
+    _score_response(result, resp.headers, parsed)
+
+    # HTTPS / TLS (separate handshake only if the connection gave nothing)
+    info = capture.info
+    if info is None and parsed.scheme == "https" and parsed.hostname:
+        try:
+            info = get_tls_and_cert(parsed.hostname, parsed.port or 443)
+        except Exception:
+            pass
+    _score_tls(result, parsed, info)
+
+    # HTTP -> HTTPS redirect
+    return _score_redirect(result, http_to_https_redirect_check(parsed))
+
+
+class AuditClient:
+    """
+    Shared state for async audits: one pooled requests.Session (keep-alive
+    connections are reused across probes and targets, so a host is resolved
+    once per new connection rather than per request), a thread pool for its
+    blocking calls, and an optional on-disk AuditCache for conditional
+    revalidation across runs.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_CONCURRENCY,
+        cache: Optional[AuditCache] = None,
+    ) -> None:
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        # Audits must not depend on each other: the session keeps no cookies, so a
+        # Set-Cookie from one response is never sent to another probe or target
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Two blocking requests per target (main fetch + redirect probe)
+        self.executor = ThreadPoolExecutor(max_workers=2 * pool_size, thread_name_prefix="audit")
+
+    async def get(self, url: str, timeout: int, **kwargs: Any) -> requests.Response:
+        """fetch_headers() on the pooled session, off the event loop."""
+        loop = asyncio.get_running_loop()
+        call = partial(fetch_headers, self.session.get, url, timeout, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    def close(self) -> None:
+        self.session.close()
+        self.executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> "AuditClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+async def get_tls_and_cert_async(host: str, port: int = 443, timeout: int = 7) -> HttpsInfo:
+    """get_tls_and_cert on the event loop."""
+    ctx = ssl.create_default_context()
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, ssl=ctx, server_hostname=host),
+        timeout,
+    )
+    try:
+        return _https_info(writer.get_extra_info("ssl_object"))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+async def _tls_probe(host: str, port: int) -> Optional[HttpsInfo]:
+    try:
+        return await get_tls_and_cert_async(host, port)
+    except Exception:
+        return None
+
+
+async def _redirect_probe(client: AuditClient, parsed, timeout: int) -> Optional[bool]:
+    if not parsed.hostname:
+        return None
+    try:
+        r = await client.get(build_url(parsed, "http"), timeout)
+        return _redirects_to_https(r, build_url(parsed, "https"))
+    except Exception:
+        return None
+
+
+async def audit_async(url: str, timeout: int = 10, client: Optional[AuditClient] = None) -> Dict[str, Any]:
+    """
+    Same report as audit(), but the main fetch and the redirect probe run
+    concurrently, so a target costs about the slower of the two rather than
+    their sum. TLS metadata comes from the main fetch's connection; the
+    separate TLS probe only runs if that gave nothing. Pass a shared
+    AuditClient to pool connections across targets.
+    """
+    if client is None:
+        with AuditClient(pool_size=1) as own:
+            return await audit_async(url, timeout, own)
+
+    target = normalize_target(url)
+    parsed = urlparse(target)
+    result = _new_result(target)
+
+    cache = client.cache
+    cached = cache.get_response(target) if cache else None
+    capture = TlsCapture(parsed.hostname)
+    resp, redirect_ok = await asyncio.gather(
+        client.get(
+            target,
+            timeout,
+            headers=cached.validators() if cached else None,
+            hooks={"response": capture},
+        ),
+        _redirect_probe(client, parsed, timeout),
+        return_exceptions=True,
+    )
+
+    if isinstance(resp, BaseException):
+        return _score_request_failure(result, resp)
+    headers = resp.headers
+    fetched_at = None
+    if cached is not None and resp.status_code == 304:
+        # Not modified: the stored headers still apply (refreshed by the 304's own)
+        # until the entry's max age, counted from the last full fetch
+        headers = CaseInsensitiveDict(cached.headers)
+        headers.update(resp.headers)
+        fetched_at = cached.fetched_at
+        result["cache"] = {
+            "response": "revalidated",
+            "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+        }
+    if cache:
+        cache.put_response(target, resp.url, headers, fetched_at=fetched_at)
+    _score_response(result, headers, parsed)
+
+    # TLS: from the connection if possible, else a cached probe within its TTL, else a new probe
+    info, from_cache = capture.info, False
+    tls_key = (parsed.hostname or "", parsed.port or 443)
+    if info is None and parsed.scheme == "https" and parsed.hostname:
+        stored = cache.get_tls(*tls_key) if cache else None
+        if stored is not None:
+            info, from_cache = HttpsInfo(**stored), True
+            result.setdefault("cache", {})["tls"] = "fresh"
+        else:
+            info = await _tls_probe(*tls_key)
+    if cache and info is not None and not from_cache:
+        cache.put_tls(*tls_key, asdict(info))
+    _score_tls(result, parsed, info)
+    return _score_redirect(result, redirect_ok)
+
+
 def render_html(data: Dict[str, Any], path: Path) -> None:
+    path.write_text(html_report(data), encoding="utf-8")
+
+
+def html_report(data: Dict[str, Any]) -> str:
     def pill(label: str, value: str) -> str:
         return f"""
         <div class="pill">
@@ -387,7 +683,7 @@ def render_html(data: Dict[str, Any], path: Path) -> None:
 </body>
 </html>
 """
-    path.write_text(html, encoding="utf-8")
+    return html
 
 
 def ensure_reports_dir() -> Path:
@@ -409,19 +705,238 @@ def write_reports(data: Dict[str, Any]) -> Tuple[Path, Path]:
     return json_path, html_path
 
 
+def read_targets(stream: IO[str]) -> Iterator[str]:
+    """
+    Yields one target per non-empty line, skipping '#' comments.
+    Lines are read lazily, so a long list (or a pipe) starts auditing right away.
+    """
+    for line in stream:
+        target = line.strip()
+        if target and not target.startswith("#"):
+            yield target
+
+
+def target_host(url: str) -> str:
+    return urlparse(normalize_target(url)).hostname or url.strip().lower()
+
+
+async def _audit_one(url: str, timeout: int, client: AuditClient) -> Dict[str, Any]:
+    started = time.monotonic()
+    try:
+        result = await audit_async(url, timeout=timeout, client=client)
+    except Exception as e:
+        result = {"url": url, "timestamp": utc_now_iso(), "error": f"{type(e).__name__}: {e}"}
+    result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
+
+
+async def audit_fleet(
+    targets: Iterable[str],
+    timeout: int = 10,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    client: Optional[AuditClient] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Audits many targets concurrently and yields each result as soon as it finishes
+    (completion order, not input order).
+
+    At most `concurrency` audits run at once, and at most `per_host` of them
+    against the same hostname; targets for a busy host wait in a per-host queue
+    without holding a slot. At most MAX_WAITING * concurrency targets wait at
+    once: past that the source is not read until queued targets start. The
+    source is read in a worker thread while audits run, so results are
+    yielded between reads. All audits share one AuditClient (connection pool
+    and DNS cache).
+    """
+    concurrency = max(1, concurrency)
+    per_host = max(1, per_host)
+    max_waiting = MAX_WAITING * concurrency
+    loop = asyncio.get_running_loop()
+    source = iter(targets)
+    exhausted = False
+    reading: Optional["asyncio.Future[Optional[str]]"] = None
+    waiting: Dict[str, Deque[str]] = {}
+    queued = 0
+    active: Counter = Counter()
+    running: Dict["asyncio.Future[Dict[str, Any]]", str] = {}
+    own_client = client is None
+    client = client or AuditClient(pool_size=concurrency)
+
+    def start(url: str, host: str) -> None:
+        active[host] += 1
+        running[asyncio.ensure_future(_audit_one(url, timeout, client))] = host
+
+    def place(url: str) -> None:
+        nonlocal queued
+        host = target_host(url)
+        if active[host] < per_host and host not in waiting and len(running) < concurrency:
+            start(url, host)
+        else:
+            waiting.setdefault(host, deque()).append(url)
+            queued += 1
+
+    def start_waiting() -> None:
+        nonlocal queued
+        # Queued targets for hosts that have a free slot again
+        for host in list(waiting):
+            queue = waiting[host]
+            while queue and active[host] < per_host and len(running) < concurrency:
+                start(queue.popleft(), host)
+                queued -= 1
+            if not queue:
+                del waiting[host]
+
+    try:
+        while True:
+            start_waiting()
+            if reading is None and not exhausted and len(running) < concurrency and queued < max_waiting:
+                # Reading the source (maybe a pipe) must not stall running audits
+                reading = loop.run_in_executor(None, next, source, None)
+            if reading is None and not running:
+                break
+            pending = set(running)
+            if reading is not None:
+                pending.add(reading)
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if reading in done:
+                url = reading.result()
+                reading = None
+                if url is None:
+                    exhausted = True
+                else:
+                    place(url)
+            for task in done:
+                if task in running:
+                    host = running.pop(task)
+                    active[host] -= 1
+                    yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        if own_client:
+            client.close()
+
+
+def open_cache(args: argparse.Namespace) -> Optional[AuditCache]:
+    if args.no_cache:
+        return None
+    return AuditCache(
+        Path(args.cache), tls_ttl=args.tls_ttl * 3600, response_max_age=args.response_max_age * 3600
+    )
+
+
+async def _run_fleet(args: argparse.Namespace, stream: IO[str], out: IO[str]) -> Tuple[int, int]:
+    count = failed = 0
+    store = ReportStore(Path(args.store))
+    run_id = store.start_run(utc_now_iso())
+    try:
+        with AuditClient(pool_size=args.concurrency, cache=open_cache(args)) as client:
+            async for result in audit_fleet(
+                read_targets(stream),
+                timeout=args.timeout,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                client=client,
+            ):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                store.save(run_id, result)
+                count += 1
+                failed += "error" in result or result.get("score") == 0
+    finally:
+        store.close()
+    return count, failed
+
+
+def run_fleet(args: argparse.Namespace) -> None:
+    stream = sys.stdin if args.targets == "-" else open(args.targets, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    started = time.monotonic()
+    try:
+        count, failed = asyncio.run(_run_fleet(args, stream, out))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"[+] Fleet audit complete: {count} targets ({failed} failed) in {time.monotonic() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+
+def run_query(args: argparse.Namespace) -> None:
+    store = ReportStore(Path(args.store))
+    try:
+        if args.html:
+            # A bare hostname picks that host's latest audit; anything else is a target URL
+            key = args.html if "/" not in args.html and ":" not in args.html else normalize_target(args.html)
+            data = store.latest(key)
+            if data is None:
+                sys.exit(f"[-] No stored audit for {args.html}")
+            host = (urlparse(data.get("url", "")).netloc or "target").replace(":", "_")
+            html_path = ensure_reports_dir() / f"report_{host}.html"
+            render_html(data, html_path)
+            print(f"[+] HTML report: {html_path}")
+            return
+        rows = store.score_changes() if args.changes else store.missing_hsts()
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    finally:
+        store.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Web Hardening Auditor (CLI + HTML report)")
-    parser.add_argument("url", help="Target URL (example: https://example.com)")
+    parser.add_argument("url", nargs="?", help="Target URL (example: https://example.com)")
     parser.add_argument("--timeout", type=int, default=10, help="Request timeout (seconds)")
+    parser.add_argument("--cache", metavar="FILE", default=str(DEFAULT_CACHE_PATH), help="Audit cache for repeat runs")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor update the audit cache")
+    parser.add_argument(
+        "--tls-ttl", type=float, default=DEFAULT_TLS_TTL / 3600, help="Hours a cached TLS/cert probe stays valid"
+    )
+    parser.add_argument(
+        "--response-max-age",
+        type=float,
+        default=DEFAULT_RESPONSE_MAX_AGE / 3600,
+        help="Hours cached page headers may be revalidated (304) before a full re-fetch",
+    )
+    parser.add_argument("--store", metavar="FILE", default=str(DEFAULT_STORE_PATH), help="Report store (SQLite)")
+    parser.add_argument("--files", action="store_true", help="Also write the JSON + HTML report files (single target)")
+    fleet = parser.add_argument_group("fleet mode")
+    fleet.add_argument("--targets", metavar="FILE", help="Audit every target in FILE (one per line, '-' for stdin)")
+    fleet.add_argument("--output", metavar="FILE", default="-", help="JSON lines output (default: stdout)")
+    fleet.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Audits in flight overall")
+    fleet.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Audits in flight per hostname")
+    query = parser.add_argument_group("report store queries")
+    query.add_argument("--changes", action="store_true", help="Targets whose score changed since their previous audit")
+    query.add_argument("--missing-hsts", action="store_true", help="Targets whose latest audit lacks HSTS")
+    query.add_argument("--html", metavar="TARGET", help="Render the latest stored report of TARGET (host or URL) as HTML")
     args = parser.parse_args()
 
-    data = audit(args.url, timeout=args.timeout)
-    json_path, html_path = write_reports(data)
+    if args.changes or args.missing_hsts or args.html:
+        run_query(args)
+        return
+    if args.targets:
+        run_fleet(args)
+        return
+    if not args.url:
+        parser.error("a target URL or --targets is required")
+
+    with AuditClient(pool_size=1, cache=open_cache(args)) as client:
+        data = asyncio.run(audit_async(args.url, timeout=args.timeout, client=client))
+    store = ReportStore(Path(args.store))
+    store.save(store.start_run(utc_now_iso()), data)
+    store.close()
 
     print("[+] Audit complete")
     print(f"[+] Score: {data.get('score', 0)}/100")
-    print(f"[+] JSON report: {json_path}")
-    print(f"[+] HTML report: {html_path}")
+    print(f"[+] Stored in: {args.store} (HTML: --html {data['url']})")
+    if args.files:
+        json_path, html_path = write_reports(data)
+        print(f"[+] JSON report: {json_path}")
+        print(f"[+] HTML report: {html_path}")
 
 
 if __name__ == "__main__":
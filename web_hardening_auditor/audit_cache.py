@@ -0,0 +1,131 @@
+"""
+On-disk cache for repeat audits (used by audit.py).
+
+Keeps, per normalized target, the last main-page response headers together
+with their validators (ETag / Last-Modified), so the next audit can send a
+conditional GET and reuse the stored headers on a 304. A 304 does not renew
+the entry: after max_age seconds from the last full fetch the page is
+fetched unconditionally again, since a server may change its security
+headers without changing the page's ETag. TLS/certificate metadata is kept
+per host:port with its own TTL, since certificates change far less often
+than pages.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(".audit_cache.db")
+DEFAULT_TLS_TTL = 24 * 3600  # seconds
+DEFAULT_RESPONSE_MAX_AGE = 6 * 3600  # seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    target TEXT PRIMARY KEY,
+    url TEXT,
+    headers TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tls (
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    info TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (host, port)
+);
+"""
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    headers: Dict[str, str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def validators(self) -> Dict[str, str]:
+        """Request headers that turn the next fetch into a conditional GET."""
+        out = {}
+        if self.etag:
+            out["If-None-Match"] = self.etag
+        if self.last_modified:
+            out["If-Modified-Since"] = self.last_modified
+        return out
+
+
+class AuditCache:
+    """SQLite-backed cache; safe to share between threads and the event loop."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        tls_ttl: float = DEFAULT_TLS_TTL,
+        response_max_age: float = DEFAULT_RESPONSE_MAX_AGE,
+    ) -> None:
+        self.path = Path(path)
+        self.tls_ttl = tls_ttl
+        self.response_max_age = response_max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get_response(self, target: str) -> Optional[CachedResponse]:
+        """Stored response fully fetched less than response_max_age seconds ago, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, headers, etag, last_modified, fetched_at FROM responses WHERE target = ?",
+                (target,),
+            ).fetchone()
+        if row is None or time.time() - row[4] > self.response_max_age:
+            return None
+        return CachedResponse(row[0], json.loads(row[1]), row[2], row[3], row[4])
+
+    def put_response(
+        self, target: str, url: str, headers: Dict[str, str], fetched_at: Optional[float] = None
+    ) -> None:
+        """`fetched_at` is the time of the last full (200) fetch; keep the old one on a 304."""
+        lowered = {k.lower(): v for k, v in headers.items()}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    target,
+                    url,
+                    json.dumps(dict(headers)),
+                    lowered.get("etag"),
+                    lowered.get("last-modified"),
+                    time.time() if fetched_at is None else fetched_at,
+                ),
+            )
+
+    def get_tls(self, host: str, port: int) -> Optional[Dict[str, Any]]:
+        """TLS metadata checked less than tls_ttl seconds ago, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info, checked_at FROM tls WHERE host = ? AND port = ?", (host, port)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.tls_ttl:
+            return None
+        return json.loads(row[0])
+
+    def put_tls(self, host: str, port: int, info: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tls VALUES (?, ?, ?, ?)",
+                (host, port, json.dumps(info), time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,147 @@
+"""
+Compact store for audit reports (used by audit.py).
+
+Every audit is one row in a single SQLite file, indexed by host and
+timestamp, with the full report kept as compressed JSON. Audits are grouped
+in runs (one CLI invocation, single target or fleet); trend queries compare
+each target (normalized URL) with its own previous audit. HTML is rendered
+from a stored report on demand.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+DEFAULT_STORE_PATH = Path("reports") / "audits.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audits (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    url TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    score INTEGER,
+    hsts INTEGER,  -- 1 present, 0 missing, NULL if the page could not be fetched
+    report BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audits_host_ts ON audits (host, ts);
+CREATE INDEX IF NOT EXISTS audits_url_ts ON audits (url, ts);
+CREATE INDEX IF NOT EXISTS audits_run ON audits (run_id);
+"""
+
+# Latest audit per target (rn = 1), the one before it (rn = 2), ...
+RANKED = """
+WITH ranked AS (
+    SELECT id, run_id, host, url, ts, score, hsts,
+           ROW_NUMBER() OVER (PARTITION BY url ORDER BY ts DESC, id DESC) AS rn
+    FROM audits
+)
+"""
+
+
+def report_host(report: Dict[str, Any]) -> str:
+    return urlparse(report.get("url", "")).hostname or report.get("url", "")
+
+
+def _pack(report: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(report, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class ReportStore:
+    """Audit history in SQLite; safe to share between threads and the event loop."""
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def start_run(self, started_at: str) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (started_at,)).lastrowid
+
+    def save(self, run_id: int, report: Dict[str, Any]) -> None:
+        headers = report.get("headers") or {}
+        hsts = headers.get("Strict-Transport-Security")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO audits (run_id, host, url, ts, score, hsts, report) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    report_host(report),
+                    report.get("url", ""),
+                    report.get("timestamp", ""),
+                    report.get("score"),
+                    None if hsts is None else int(hsts == "present"),
+                    _pack(report),
+                ),
+            )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def score_changes(self) -> List[Dict[str, Any]]:
+        """Targets whose latest score differs from their previous audit's."""
+        return self._query(
+            RANKED
+            + """
+            SELECT cur.host, cur.url, prev.score AS previous_score, cur.score,
+                   prev.ts AS previous_ts, cur.ts
+            FROM ranked cur JOIN ranked prev ON prev.url = cur.url AND prev.rn = 2
+            WHERE cur.rn = 1 AND cur.score IS NOT prev.score
+            ORDER BY cur.score - prev.score, cur.url
+            """
+        )
+
+    def missing_hsts(self) -> List[Dict[str, Any]]:
+        """Targets whose latest audit did not see a Strict-Transport-Security header."""
+        return self._query(
+            RANKED
+            + """
+            SELECT host, url, ts, score FROM ranked
+            WHERE rn = 1 AND hsts = 0
+            ORDER BY host, url
+            """
+        )
+
+    def history(self, target: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """Most recent audits of `target` (a host or a normalized URL), newest first."""
+        return self._query(
+            "SELECT url, ts, score, run_id FROM audits WHERE host = ? OR url = ? "
+            "ORDER BY ts DESC, id DESC LIMIT ?",
+            (target, target, limit),
+        )
+
+    def latest(self, target: str) -> Optional[Dict[str, Any]]:
+        """Full report of the latest audit of `target` (a host or a normalized URL)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report FROM audits WHERE host = ? OR url = ? ORDER BY ts DESC, id DESC LIMIT 1",
+                (target, target),
+            ).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()